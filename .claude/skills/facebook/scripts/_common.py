@@ -0,0 +1,192 @@
+"""Shared Facebook helpers -- credentials and persistent Graph API connections (stdlib only)."""
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from functools import lru_cache
+
+try:
+    # Faster, and parses response bytes without an intermediate str
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads  # also accepts bytes
+
+GRAPH_HOST = "graph.facebook.com"
+GRAPH_VERSION = "v21.0"
+TOKEN_FILE = "/home/ubuntu/.claude-agent/facebook-page-token.json"
+
+# Rate limiting and transient server errors are retried with exponential
+# backoff (0.5s, 1s, 2s) so one blip doesn't abort a multi-photo post.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Statuses meaning the request was not processed, the only ones safe to
+# retry for a POST that publishes something: after a 500/502/504 the post
+# may already exist, and resending it would publish a duplicate.
+UNPROCESSED_STATUSES = {429, 503}
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+# Raised when a reused keep-alive connection turns out to have been closed
+# by the server while idle.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+# A request that must not be sent twice is not resent after such an error
+# (the server may have acted on it before closing); instead its connection
+# is replaced beforehand if it has been idle this long, since Graph's
+# keep-alive timeout is undocumented.
+MAX_IDLE_SECONDS = 15
+
+# One keep-alive connection per thread: http.client connections are not
+# thread-safe, but each upload worker can reuse its own across requests
+# instead of paying a TCP + TLS handshake per call.
+_local = threading.local()
+
+
+# ---------------------------------------------------------------------------
+# Credentials
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def load_credentials():
+    """Return (page_id, token) from env vars (priority) or TOKEN_FILE.
+
+    Cached for the life of the process; returns (None, None) if not found.
+    """
+    page_id = os.environ.get("FACEBOOK_PAGE_ID")
+    token = os.environ.get("FACEBOOK_PAGE_TOKEN")
+
+    if page_id and token:
+        return page_id, token
+
+    # Fall back to JSON file
+    try:
+        with open(TOKEN_FILE) as f:
+            data = json.load(f)
+        page_id = data.get("page_id")
+        token = data.get("page_access_token")
+        if page_id and token:
+            return page_id, token
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, OSError) as exc:
+        print(f"Warning: could not read {TOKEN_FILE}: {exc}", file=sys.stderr)
+
+    return None, None
+
+
+# ---------------------------------------------------------------------------
+# Graph API
+# ---------------------------------------------------------------------------
+
+class GraphAPIError(RuntimeError):
+    """Raised when the Graph API answers with an HTTP error status."""
+
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+        super().__init__(_error_message(status, body))
+
+
+def _error_message(status, body):
+    """Extract Facebook's error message from a response body."""
+    try:
+        text = body.decode()
+        fb_err = json.loads(text).get("error", {})
+        return fb_err.get("message") or text
+    except Exception:
+        return f"HTTP {status}"
+
+
+def _get_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = http.client.HTTPSConnection(GRAPH_HOST)
+        _local.conn = conn
+    return conn
+
+
+def warm_connection():
+    """Open this thread's connection ahead of its first request (best effort)."""
+    conn = _get_connection()
+    if conn.sock is None:
+        try:
+            conn.connect()
+            _local.last_used = time.monotonic()
+        except OSError:
+            conn.close()  # the next request will simply connect again
+
+
+def _close_if_idle():
+    """Close this thread's connection if unused for MAX_IDLE_SECONDS."""
+    conn = _get_connection()
+    if conn.sock is not None and time.monotonic() - getattr(_local, "last_used", 0) > MAX_IDLE_SECONDS:
+        conn.close()
+
+
+def _send(method, path, body, headers):
+    """Send one request over this thread's connection; return (status, body)."""
+    conn = _get_connection()
+    try:
+        conn.request(method, f"/{GRAPH_VERSION}{path}", body=body, headers=headers)
+        resp = conn.getresponse()
+        data = resp.read()
+        _local.last_used = time.monotonic()
+        return resp.status, data
+    except Exception:
+        # Leave the connection in a clean state for the next caller
+        conn.close()
+        raise
+
+
+def graph_request(method, path, body=None, headers=None, retries=MAX_RETRIES,
+                  retry_statuses=RETRY_STATUSES, idempotent=True):
+    """
+    Send a request to the Graph API over this thread's persistent connection.
+
+    path is relative to the versioned API root, e.g. "/me/accounts?...".
+    Rate-limit and transient server errors (`retry_statuses`) are retried up
+    to `retries` times with exponential backoff; body must therefore be
+    bytes or a re-iterable object. A keep-alive connection the server has
+    dropped is reopened and the request resent once, unless it is not
+    `idempotent` (e.g. a public post), which gets a fresh connection if
+    its own has been idle for MAX_IDLE_SECONDS and is never resent.
+    Returns the decoded JSON response; raises GraphAPIError on HTTP errors.
+    """
+    if not idempotent:
+        _close_if_idle()
+    for attempt in range(retries + 1):
+        try:
+            status, data = _send(method, path, body, headers or {})
+        except STALE_CONNECTION_ERRORS:
+            if not idempotent:
+                raise
+            # The server dropped an idle keep-alive connection between our
+            # requests; _send() has closed it, so resend once on a fresh one.
+            status, data = _send(method, path, body, headers or {})
+        if status not in retry_statuses or attempt == retries:
+            break
+        time.sleep(BACKOFF_SECONDS * 2 ** attempt)
+
+    if status >= 400:
+        raise GraphAPIError(status, data)
+    return _loads(data)
+
+
+def graph_get(path, params):
+    """GET a Graph API path with query parameters."""
+    return graph_request("GET", f"{path}?{urllib.parse.urlencode(params)}")
+
+
+def graph_post_form(path, params, retry_statuses=RETRY_STATUSES, idempotent=True):
+    """POST url-encoded form parameters to a Graph API path."""
+    return graph_request(
+        "POST",
+        path,
+        body=urllib.parse.urlencode(params).encode(),
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        retry_statuses=retry_statuses,
+        idempotent=idempotent,
+    )
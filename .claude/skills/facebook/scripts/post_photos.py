@@ -15,116 +15,129 @@ Output (stdout):
 """
 
 import argparse
-import io
 import json
-import mimetypes
 import os
+import stat
 import sys
-import urllib.error
-import urllib.parse
-import urllib.request
 import uuid
-
-GRAPH_API = "https://graph.facebook.com/v21.0"
-TOKEN_FILE = "/home/ubuntu/.claude-agent/facebook-page-token.json"
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import (
+    TOKEN_FILE, UNPROCESSED_STATUSES, GraphAPIError, graph_post_form, graph_request, load_credentials,
+    warm_connection,
+)
+
+DEFAULT_CONCURRENCY = 4
+CHUNK_SIZE = 64 * 1024
+
+# Image formats Facebook accepts; avoids loading the system mimetypes database
+IMAGE_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+    ".tif": "image/tiff",
+    ".tiff": "image/tiff",
+    ".heic": "image/heic",
+}
 
 
 # ---------------------------------------------------------------------------
-# Credentials
+# Multipart form-data helpers (stdlib only)
 # ---------------------------------------------------------------------------
 
-def load_credentials():
-    page_id = os.environ.get("FACEBOOK_PAGE_ID")
-    token = os.environ.get("FACEBOOK_PAGE_TOKEN")
+def _advise(fd, advice):
+    """Best-effort posix_fadvise() hint over a whole file (no-op off Linux)."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+        except OSError:
+            pass
 
-    if page_id and token:
-        return page_id, token
 
-    # Fall back to JSON file
+def prefetch(path):
+    """Start reading a photo into the page cache ahead of its upload."""
     try:
-        with open(TOKEN_FILE) as f:
-            data = json.load(f)
-        page_id = data.get("page_id")
-        token = data.get("page_access_token")
-        if page_id and token:
-            return page_id, token
-    except FileNotFoundError:
-        pass
-    except (json.JSONDecodeError, OSError) as exc:
-        print(f"Warning: could not read {TOKEN_FILE}: {exc}", file=sys.stderr)
-
-    return None, None
-
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        _advise(fd, "POSIX_FADV_WILLNEED")
+    finally:
+        os.close(fd)
 
-# ---------------------------------------------------------------------------
-# Multipart form-data helpers (stdlib only)
-# ---------------------------------------------------------------------------
 
-def _encode_multipart(fields, files):
+class MultipartBody:
     """
-    Build a multipart/form-data body.
+    Lazily generated multipart/form-data body.
 
     fields : dict of {name: value}  (plain text fields)
-    files  : list of (field_name, filename, content_type, data_bytes)
+    files  : list of (field_name, filename, content_type, file_path, size)
 
-    Returns (body_bytes, content_type_header_value).
+    Iterating yields the form framing followed by each file's contents in
+    CHUNK_SIZE pieces, opening the file only while its part is being sent.
+    len() is known up front, so the request carries a Content-Length rather
+    than using chunked encoding, and the body can be iterated again if the
+    request has to be resent.
     """
-    boundary = uuid.uuid4().hex
-    buf = io.BytesIO()
 
-    def write(s):
-        buf.write(s if isinstance(s, bytes) else s.encode())
-
-    crlf = b"\r\n"
-
-    for name, value in fields.items():
-        write(f"--{boundary}\r\n")
-        write(f'Content-Disposition: form-data; name="{name}"\r\n')
-        write(crlf)
-        write(f"{value}\r\n")
-
-    for field_name, filename, content_type, data in files:
-        write(f"--{boundary}\r\n")
-        write(
-            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+    def __init__(self, fields, files):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+
+        # Alternating framing bytes and file paths, in send order
+        self._segments = []
+        head = "".join(
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n'
+            f"\r\n{value}\r\n"
+            for name, value in fields.items()
         )
-        write(f"Content-Type: {content_type}\r\n")
-        write(crlf)
-        buf.write(data)
-        buf.write(crlf)
-
-    write(f"--{boundary}--\r\n")
-
-    body = buf.getvalue()
-    content_type_header = f"multipart/form-data; boundary={boundary}"
-    return body, content_type_header
+        self._length = 0
+        for field_name, filename, content_type, path, size in files:
+            head += (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n"
+                "\r\n"
+            )
+            head = head.encode()
+            self._segments += [head, path]
+            self._length += len(head) + size
+            head = "\r\n"
+        tail = f"{head}--{boundary}--\r\n".encode()
+        self._segments.append(tail)
+        self._length += len(tail)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for seg in self._segments:
+            if isinstance(seg, bytes):
+                yield seg
+                continue
+            with open(seg, "rb") as f:
+                _advise(f.fileno(), "POSIX_FADV_SEQUENTIAL")
+                while chunk := f.read(CHUNK_SIZE):
+                    yield chunk
 
 
 # ---------------------------------------------------------------------------
 # Graph API helpers
 # ---------------------------------------------------------------------------
 
-def _handle_http_error(exc):
-    """Parse a Facebook HTTPError and return a human-readable string."""
-    try:
-        body = exc.read().decode()
-        err_data = json.loads(body)
-        fb_err = err_data.get("error", {})
-        return fb_err.get("message") or body
-    except Exception:
-        return f"HTTP {exc.code}"
-
-
-def upload_photo_unpublished(page_id, token, photo_path):
+def upload_photo_unpublished(photos_path, token, photo_path, size):
     """
-    Upload a single photo as unpublished and return its photo ID.
+    Upload a single photo (of `size` bytes) as unpublished to photos_path
+    ("/PAGE_ID/photos") and return its photo ID.
     """
-    mime_type, _ = mimetypes.guess_type(photo_path)
-    if not mime_type:
-        mime_type = "application/octet-stream"
-
-    with open(photo_path, "rb") as f:
-        photo_data = f.read()
+    ext = os.path.splitext(photo_path)[1].lower()
+    mime_type = IMAGE_MIME_TYPES.get(ext, "application/octet-stream")
 
     filename = os.path.basename(photo_path)
 
@@ -132,52 +145,36 @@ def upload_photo_unpublished(page_id, token, photo_path):
         "published": "false",
         "access_token": token,
     }
-    files = [("source", filename, mime_type, photo_data)]
-
-    body, ct_header = _encode_multipart(fields, files)
 
-    url = f"{GRAPH_API}/{page_id}/photos"
-    req = urllib.request.Request(
-        url,
-        data=body,
-        headers={"Content-Type": ct_header},
-        method="POST",
-    )
+    body = MultipartBody(fields, [("source", filename, mime_type, photo_path, size)])
 
     try:
-        with urllib.request.urlopen(req) as resp:
-            result = json.loads(resp.read().decode())
-            return result["id"]
-    except urllib.error.HTTPError as exc:
-        msg = _handle_http_error(exc)
-        raise RuntimeError(f"Failed to upload photo '{filename}': {msg}") from exc
+        result = graph_request(
+            "POST",
+            photos_path,
+            body=body,
+            headers={"Content-Type": body.content_type, "Content-Length": str(len(body))},
+        )
+        return result["id"]
+    except GraphAPIError as exc:
+        raise RuntimeError(f"Failed to upload photo '{filename}': {exc}") from exc
 
 
-def create_feed_post(page_id, token, message, photo_ids):
+def create_feed_post(feed_path, token, message, photo_ids):
     """
-    Create a feed post that attaches the given (already-uploaded) photo IDs.
+    Create a feed post on feed_path ("/PAGE_ID/feed") that attaches the
+    given (already-uploaded) photo IDs.
     """
     params = {"message": message, "access_token": token}
 
     for i, pid in enumerate(photo_ids):
         params[f"attached_media[{i}]"] = json.dumps({"media_fbid": pid})
 
-    body = urllib.parse.urlencode(params).encode()
-    url = f"{GRAPH_API}/{page_id}/feed"
-    req = urllib.request.Request(
-        url,
-        data=body,
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        method="POST",
-    )
-
     try:
-        with urllib.request.urlopen(req) as resp:
-            result = json.loads(resp.read().decode())
-            return result["id"]
-    except urllib.error.HTTPError as exc:
-        msg = _handle_http_error(exc)
-        raise RuntimeError(f"Failed to create feed post: {msg}") from exc
+        result = graph_post_form(feed_path, params, retry_statuses=UNPROCESSED_STATUSES, idempotent=False)
+        return result["id"]
+    except GraphAPIError as exc:
+        raise RuntimeError(f"Failed to create feed post: {exc}") from exc
 
 
 # ---------------------------------------------------------------------------
@@ -192,13 +189,34 @@ def main():
     parser.add_argument(
         "--photos", required=True, nargs="+", metavar="FILE", help="Photo file paths"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Max parallel photo uploads (default: {DEFAULT_CONCURRENCY})",
+    )
     args = parser.parse_args()
 
-    # Validate photo files exist before hitting the API
+    if args.concurrency < 1:
+        print(json.dumps({"error": "--concurrency must be at least 1"}))
+        sys.exit(1)
+
+    # Validate photo files exist before hitting the API. The one stat per
+    # file also supplies the size used for each upload's Content-Length.
+    photos = []
     for path in args.photos:
-        if not os.path.isfile(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
             print(json.dumps({"error": f"Photo file not found: {path}"}))
             sys.exit(1)
+        photos.append((path, st.st_size))
+
+    # Let disk readahead overlap with credential loading and TLS setup
+    for path, _ in photos:
+        prefetch(path)
 
     page_id, token = load_credentials()
     if not page_id or not token:
@@ -214,16 +232,30 @@ def main():
         )
         sys.exit(1)
 
+    # Built once rather than per request
+    photos_path = f"/{page_id}/photos"
+    feed_path = f"/{page_id}/feed"
+
+    def upload(path, size):
+        print(f"Uploading {path} ...", file=sys.stderr)
+        pid = upload_photo_unpublished(photos_path, token, path, size)
+        print(f"  -> {path}: photo ID {pid}", file=sys.stderr)
+        return pid
+
     try:
-        photo_ids = []
-        for path in args.photos:
-            print(f"Uploading {path} ...", file=sys.stderr)
-            pid = upload_photo_unpublished(page_id, token, path)
-            print(f"  -> photo ID {pid}", file=sys.stderr)
-            photo_ids.append(pid)
+        # Uploads are independent and I/O-bound, so run them concurrently.
+        # Results are collected in submission order so attached_media[i]
+        # matches the order the photos were given on the command line.
+        workers = min(args.concurrency, len(photos))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(upload, path, size) for path, size in photos]
+            # The feed post goes out on this thread's own connection; open it
+            # while the uploads are in flight instead of after they finish.
+            warm_connection()
+            photo_ids = [f.result() for f in futures]
 
         print("Creating post ...", file=sys.stderr)
-        post_id_full = create_feed_post(page_id, token, args.message, photo_ids)
+        post_id_full = create_feed_post(feed_path, token, args.message, photo_ids)
 
         # The returned id is typically "PAGE_ID_POST_ID"; extract the numeric post part
         post_numeric = post_id_full.split("_")[-1] if "_" in post_id_full else post_id_full
@@ -16,41 +16,11 @@ Output (stdout):
 
 import argparse
 import json
-import os
 import sys
-import urllib.error
-import urllib.parse
-import urllib.request
+from pathlib import Path
 
-GRAPH_API = "https://graph.facebook.com/v21.0"
-TOKEN_FILE = "/home/ubuntu/.claude-agent/facebook-page-token.json"
-
-
-# ---------------------------------------------------------------------------
-# Credentials
-# ---------------------------------------------------------------------------
-
-def load_credentials():
-    page_id = os.environ.get("FACEBOOK_PAGE_ID")
-    token = os.environ.get("FACEBOOK_PAGE_TOKEN")
-
-    if page_id and token:
-        return page_id, token
-
-    # Fall back to JSON file
-    try:
-        with open(TOKEN_FILE) as f:
-            data = json.load(f)
-        page_id = data.get("page_id")
-        token = data.get("page_access_token")
-        if page_id and token:
-            return page_id, token
-    except FileNotFoundError:
-        pass
-    except (json.JSONDecodeError, OSError) as exc:
-        print(f"Warning: could not read {TOKEN_FILE}: {exc}", file=sys.stderr)
-
-    return None, None
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import TOKEN_FILE, UNPROCESSED_STATUSES, GraphAPIError, graph_post_form, load_credentials
 
 
 # ---------------------------------------------------------------------------
@@ -62,29 +32,14 @@ def create_text_post(page_id, token, message):
     POST to /feed with a plain text message.  Returns the full post ID string.
     """
     params = {"message": message, "access_token": token}
-    body = urllib.parse.urlencode(params).encode()
-    url = f"{GRAPH_API}/{page_id}/feed"
-
-    req = urllib.request.Request(
-        url,
-        data=body,
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        method="POST",
-    )
 
     try:
-        with urllib.request.urlopen(req) as resp:
-            result = json.loads(resp.read().decode())
-            return result["id"]
-    except urllib.error.HTTPError as exc:
-        try:
-            body_text = exc.read().decode()
-            err_data = json.loads(body_text)
-            fb_err = err_data.get("error", {})
-            msg = fb_err.get("message") or body_text
-        except Exception:
-            msg = f"HTTP {exc.code}"
-        raise RuntimeError(f"Failed to create post: {msg}") from exc
+        result = graph_post_form(
+            f"/{page_id}/feed", params, retry_statuses=UNPROCESSED_STATUSES, idempotent=False,
+        )
+        return result["id"]
+    except GraphAPIError as exc:
+        raise RuntimeError(f"Failed to create post: {exc}") from exc
 
 
 # ---------------------------------------------------------------------------
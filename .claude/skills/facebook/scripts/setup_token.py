@@ -18,13 +18,16 @@ Usage:
 import argparse
 import json
 import sys
-import urllib.request
 import urllib.parse
-import urllib.error
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import GRAPH_VERSION, TOKEN_FILE, GraphAPIError, graph_get
 
-GRAPH_API = "https://graph.facebook.com/v21.0"
 REDIRECT_URI = "https://www.facebook.com/connect/login_success.html"
-TOKEN_FILE = "/home/ubuntu/.claude-agent/facebook-page-token.json"
+OAUTH_DIALOG_URL = f"https://www.facebook.com/{GRAPH_VERSION}/dialog/oauth"
+ACCESS_TOKEN_PATH = "/oauth/access_token"
+ACCOUNTS_PATH = "/me/accounts"
 
 PERMISSIONS = [
     "pages_manage_posts",
@@ -34,51 +37,44 @@ PERMISSIONS = [
 ]
 
 
-def api_get(url):
+def api_get(path, params):
     try:
-        req = urllib.request.Request(url)
-        with urllib.request.urlopen(req) as resp:
-            return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode()
+        return graph_get(path, params)
+    except GraphAPIError as e:
+        body = e.body.decode(errors="replace")
         try:
             err = json.loads(body)
             print(f"API Error: {json.dumps(err, indent=2)}", file=sys.stderr)
         except Exception:
-            print(f"HTTP {e.code}: {body}", file=sys.stderr)
+            print(f"HTTP {e.status}: {body}", file=sys.stderr)
         sys.exit(1)
 
 
 def exchange_code_for_token(app_id, app_secret, code):
     """Exchange authorization code for short-lived user access token."""
-    params = urllib.parse.urlencode({
+    data = api_get(ACCESS_TOKEN_PATH, {
         "client_id": app_id,
         "redirect_uri": REDIRECT_URI,
         "client_secret": app_secret,
         "code": code,
     })
-    url = f"{GRAPH_API}/oauth/access_token?{params}"
-    data = api_get(url)
     return data["access_token"]
 
 
 def extend_token(app_id, app_secret, short_token):
     """Exchange short-lived token for long-lived token (~60 days)."""
-    params = urllib.parse.urlencode({
+    data = api_get(ACCESS_TOKEN_PATH, {
         "grant_type": "fb_exchange_token",
         "client_id": app_id,
         "client_secret": app_secret,
         "fb_exchange_token": short_token,
     })
-    url = f"{GRAPH_API}/oauth/access_token?{params}"
-    data = api_get(url)
     return data["access_token"]
 
 
 def get_page_token(user_token, page_name):
     """Get never-expiring page access token from long-lived user token."""
-    url = f"{GRAPH_API}/me/accounts?access_token={urllib.parse.quote(user_token)}"
-    data = api_get(url)
+    data = api_get(ACCOUNTS_PATH, {"access_token": user_token})
 
     for page in data.get("data", []):
         if page_name.lower() in page.get("name", "").lower() or page_name.lower() in page.get("id", "").lower():
@@ -119,7 +115,7 @@ def main():
             "scope": ",".join(PERMISSIONS),
             "response_type": "code",
         })
-        oauth_url = f"https://www.facebook.com/v21.0/dialog/oauth?{params}"
+        oauth_url = f"{OAUTH_DIALOG_URL}?{params}"
 
         print("=" * 60)
         print("STEP 1: Open this URL in your browser and authorize:")
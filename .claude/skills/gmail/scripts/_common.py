@@ -0,0 +1,79 @@
+"""Shared Gmail helpers -- app password credentials, IMAP FETCH parsing, JSON output."""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import orjson  # several times faster than json on large payloads
+except ImportError:
+    orjson = None
+
+CREDS_FILE = Path("/home/ubuntu/agent/gmail_app_password.json")
+
+
+@lru_cache(maxsize=1)
+def _read_creds(mtime_ns):
+    with open(CREDS_FILE) as f:
+        c = json.load(f)
+    return c["email"], c["app_password"].replace(" ", "")
+
+
+def load_creds():
+    """Return (email, app_password), re-reading the file only when it changes."""
+    return _read_creds(CREDS_FILE.stat().st_mtime_ns)
+
+
+def dumps(obj, pretty=False):
+    """Serialize obj to JSON text, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None,
+                      separators=None if pretty else (",", ":"))
+
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# catch the latter either way
+loads = orjson.loads if orjson is not None else json.loads
+
+
+_UID_RE = re.compile(rb"\bUID (\d+)")
+
+
+def parse_fetch(msg_data):
+    """Group a multi-message (UID) FETCH response into {uid: {section: bytes}}.
+
+    Sections are keyed "header", "text" or "full" depending on which
+    BODY[...] item each literal answers.
+    """
+    messages = {}
+    current = None
+    meta_text = b""
+
+    def finish():
+        if current is not None:
+            m = _UID_RE.search(meta_text)
+            messages[m.group(1) if m else meta_text.split(None, 1)[0]] = current
+
+    for item in msg_data:
+        if isinstance(item, bytes):
+            meta_text += item  # trailing items, e.g. b" UID 42)"
+            continue
+        meta, literal = item
+        if meta[:1].isdigit():
+            finish()
+            current = {}
+            meta_text = meta
+        else:
+            meta_text += meta
+        if current is None:
+            continue
+        if b"HEADER" in meta:
+            current["header"] = literal
+        elif b"TEXT" in meta:
+            current["text"] = literal
+        else:
+            current["full"] = literal
+    finish()
+    return messages
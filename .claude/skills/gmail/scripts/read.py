@@ -6,89 +6,244 @@ Usage:
   python3 read.py --count 5 --unread          # Unread only
   python3 read.py --count 5 --folder INBOX    # Specific folder
   python3 read.py --search "from:boss@work.com"  # Search
+  python3 read.py --daemon                    # Serve reads over a Unix socket
+
+While a --daemon process is running, normal invocations are answered by it
+over SOCKET_PATH, reusing its logged-in IMAP connection instead of paying
+TLS + LOGIN on every call.
 """
 
 import argparse
 import email
 import imaplib
 import json
-from email.header import decode_header
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from email.header import decode_header, make_header
 from pathlib import Path
 
-CREDS_FILE = Path("/home/ubuntu/agent/gmail_app_password.json")
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_creds, parse_fetch
+
+SOCKET_PATH = Path("/home/ubuntu/.claude-agent/gmail-read.sock")
+KEEPALIVE_SECONDS = 300
+BODY_CHARS = 500
+# Only the headers we report (plus the MIME ones needed to decode the body)
+# and the first few KB of the body are downloaded; BODY_CHARS of text rarely
+# needs more than that even with MIME framing and transfer encoding.
+PEEK_BYTES = 2048
+FETCH_SPEC = (
+    "(BODY.PEEK[HEADER.FIELDS (FROM TO SUBJECT DATE MIME-VERSION "
+    f"CONTENT-TYPE CONTENT-TRANSFER-ENCODING)] BODY.PEEK[TEXT]<0.{PEEK_BYTES}>)"
+)
 
 
-def load_creds():
-    with open(CREDS_FILE) as f:
-        c = json.load(f)
-    return c["email"], c["app_password"].replace(" ", "")
+def _decode_part(part, enc):
+    if isinstance(part, str):
+        return part
+    try:
+        return part.decode(enc or "utf-8", errors="replace")
+    except LookupError:  # unknown charset label
+        return part.decode("utf-8", errors="replace")
 
 
 def decode_str(s):
     if s is None:
         return ""
     parts = decode_header(s)
-    result = []
-    for part, enc in parts:
-        if isinstance(part, bytes):
-            result.append(part.decode(enc or "utf-8", errors="replace"))
-        else:
-            result.append(part)
-    return "".join(result)
+    try:
+        return str(make_header(parts))
+    except (LookupError, UnicodeError):
+        # Unknown charset or bytes that don't match it: decode leniently
+        return "".join(_decode_part(part, enc) for part, enc in parts)
 
 
 def get_body(msg):
-    if msg.is_multipart():
-        for part in msg.walk():
-            ct = part.get_content_type()
-            cd = str(part.get("Content-Disposition", ""))
-            if ct == "text/plain" and "attachment" not in cd:
-                return part.get_payload(decode=True).decode("utf-8", errors="replace")
-    else:
-        return msg.get_payload(decode=True).decode("utf-8", errors="replace")
+    if not msg.is_multipart():
+        payload = msg.get_payload(decode=True)
+        return payload.decode("utf-8", errors="replace") if payload else ""
+
+    # Depth-first in document order, but never descend into attachments
+    # (e.g. forwarded messages) or decode non-text leaves on the way.
+    stack = [msg]
+    while stack:
+        part = stack.pop()
+        if "attachment" in str(part.get("Content-Disposition", "")):
+            continue
+        if part.is_multipart():
+            stack.extend(reversed(part.get_payload()))
+        elif part.get_content_type() == "text/plain":
+            payload = part.get_payload(decode=True)
+            return payload.decode("utf-8", errors="replace") if payload else ""
     return ""
 
 
-def read_emails(count=10, unread_only=False, folder="INBOX", search=None):
+# A single logged-in connection, shared by every read in this process
+# (daemon requests, or callers that import this module).
+_imap = None
+_imap_lock = threading.Lock()
+
+
+def _get_imap():
+    """Return the shared IMAP connection, reconnecting if it has dropped.
+
+    Callers must hold _imap_lock.
+    """
+    global _imap
+    if _imap is not None:
+        try:
+            _imap.noop()
+            return _imap
+        except (imaplib.IMAP4.error, OSError):
+            _imap = None
+
     user, password = load_creds()
+    imap = imaplib.IMAP4_SSL("imap.gmail.com", 993)
+    imap.login(user, password)
+    _imap = imap
+    return imap
+
 
-    with imaplib.IMAP4_SSL("imap.gmail.com", 993) as imap:
-        imap.login(user, password)
+def read_emails(count=10, unread_only=False, folder="INBOX", search=None):
+    with _imap_lock:
+        imap = _get_imap()
         imap.select(folder)
 
+        # UIDs (unlike sequence numbers) stay valid across EXPUNGEs
         if search:
-            _, data = imap.search(None, search)
+            _, data = imap.uid("SEARCH", None, search)
         elif unread_only:
-            _, data = imap.search(None, "UNSEEN")
+            _, data = imap.uid("SEARCH", None, "UNSEEN")
         else:
-            _, data = imap.search(None, "ALL")
+            _, data = imap.uid("SEARCH", None, "ALL")
 
         ids = data[0].split()
         ids = ids[-count:]  # Most recent N
 
+        if not ids:
+            return []
+
+        # One FETCH for the whole set instead of a round-trip per message
+        _, msg_data = imap.uid("FETCH", b",".join(ids), FETCH_SPEC)
+        fetched = parse_fetch(msg_data)
+
+        messages = {}
+        fallback = []
+        for uid, parts in fetched.items():
+            msg = email.message_from_bytes(parts.get("header", b"") + parts.get("text", b""))
+            messages[uid] = msg
+            # The plain-text part may start beyond the peeked prefix (e.g. after
+            # a large HTML alternative); fetch those few messages in full. A
+            # prefix shorter than PEEK_BYTES is the whole TEXT already.
+            if msg.is_multipart() and not get_body(msg) and len(parts.get("text", b"")) >= PEEK_BYTES:
+                fallback.append(uid)
+
+        if fallback:
+            _, msg_data = imap.uid("FETCH", b",".join(fallback), "(BODY.PEEK[])")
+            for uid, parts in parse_fetch(msg_data).items():
+                if "full" in parts:
+                    messages[uid] = email.message_from_bytes(parts["full"])
+
         results = []
         for uid in reversed(ids):
-            _, msg_data = imap.fetch(uid, "(RFC822)")
-            msg = email.message_from_bytes(msg_data[0][1])
+            msg = messages.get(uid)
+            if msg is None:
+                continue
             results.append({
                 "id": uid.decode(),
                 "from": decode_str(msg["From"]),
                 "to": decode_str(msg["To"]),
                 "subject": decode_str(msg["Subject"]),
                 "date": msg["Date"],
-                "body": get_body(msg)[:500],  # Truncate long bodies
+                "body": get_body(msg)[:BODY_CHARS],  # Truncate long bodies
             })
 
         return results
 
 
+# ---------------------------------------------------------------------------
+# Daemon mode
+# ---------------------------------------------------------------------------
+
+class _ReadHandler(socketserver.StreamRequestHandler):
+    """Answer one JSON request line with one JSON response line."""
+
+    def handle(self):
+        try:
+            req = json.loads(self.rfile.readline())
+            result = read_emails(
+                req.get("count", 10), req.get("unread", False),
+                req.get("folder", "INBOX"), req.get("search"),
+            )
+        except Exception as e:
+            result = {"error": str(e)}
+        self.wfile.write(json.dumps(result, ensure_ascii=False).encode() + b"\n")
+
+
+def _keepalive():
+    """Ping the idle connection so the server doesn't drop it."""
+    while True:
+        time.sleep(KEEPALIVE_SECONDS)
+        with _imap_lock:
+            if _imap is not None:
+                try:
+                    _imap.noop()
+                except (imaplib.IMAP4.error, OSError):
+                    pass  # _get_imap() reconnects on next use
+
+
+def serve():
+    """Run as a long-lived reader listening on SOCKET_PATH."""
+    SOCKET_PATH.unlink(missing_ok=True)
+    with socketserver.ThreadingUnixStreamServer(str(SOCKET_PATH), _ReadHandler) as server:
+        os.chmod(SOCKET_PATH, 0o600)
+        threading.Thread(target=_keepalive, daemon=True).start()
+        try:
+            server.serve_forever()
+        finally:
+            SOCKET_PATH.unlink(missing_ok=True)
+
+
+def read_via_daemon(count, unread_only, folder, search):
+    """Ask a running daemon to do the read. Returns None if none is listening."""
+    if not SOCKET_PATH.exists():
+        return None
+    req = {"count": count, "unread": unread_only, "folder": folder, "search": search}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(SOCKET_PATH))
+            sock.sendall(json.dumps(req).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                result = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    if isinstance(result, dict) and "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Read emails from Gmail")
     parser.add_argument("--count", type=int, default=5, help="Number of emails to fetch")
     parser.add_argument("--unread", action="store_true", help="Only unread emails")
     parser.add_argument("--folder", default="INBOX", help="Mailbox folder")
     parser.add_argument("--search", help='IMAP search string e.g. "FROM boss@work.com"')
+    parser.add_argument("--daemon", action="store_true",
+                        help=f"Serve reads on {SOCKET_PATH}, keeping one IMAP connection open")
     args = parser.parse_args()
 
-    emails = read_emails(args.count, args.unread, args.folder, args.search)
-    print(json.dumps(emails, indent=2, ensure_ascii=False))
+    if args.daemon:
+        serve()
+    else:
+        emails = read_via_daemon(args.count, args.unread, args.folder, args.search)
+        if emails is None:
+            try:
+                emails = read_emails(args.count, args.unread, args.folder, args.search)
+            finally:
+                if _imap is not None:
+                    _imap.logout()
+        print(json.dumps(emails, indent=2, ensure_ascii=False))
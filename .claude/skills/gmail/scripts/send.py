@@ -4,43 +4,41 @@
 Usage:
   python3 send.py --to recipient@example.com --subject "Hello" --body "Message body"
   python3 send.py --to a@b.com --subject "Hi" --body "Hello" --html
+  python3 send.py --to a@b.com c@d.com --subject "Hi" --body "Hello"   # One message, many recipients
 """
 
 import argparse
-import json
 import smtplib
-from email.mime.multipart import MIMEMultipart
+import sys
 from email.mime.text import MIMEText
 from pathlib import Path
 
-CREDS_FILE = Path("/home/ubuntu/agent/gmail_app_password.json")
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_creds
 
 
-def load_creds():
-    with open(CREDS_FILE) as f:
-        c = json.load(f)
-    return c["email"], c["app_password"].replace(" ", "")
-
-
-def send_email(to: str, subject: str, body: str, html: bool = False):
+def send_email(to, subject: str, body: str, html: bool = False):
+    """Send one message to one or more recipients over a single SMTP session."""
+    recipients = [to] if isinstance(to, str) else list(to)
     email, password = load_creds()
 
-    msg = MIMEMultipart("alternative" if html else "mixed")
+    # A single body needs no multipart container
+    msg = MIMEText(body, "html" if html else "plain")
     msg["From"] = email
-    msg["To"] = to
+    msg["To"] = ", ".join(recipients)
     msg["Subject"] = subject
-    msg.attach(MIMEText(body, "html" if html else "plain"))
 
+    # A single DATA transaction with one RCPT TO per recipient
     with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
         smtp.login(email, password)
-        smtp.sendmail(email, to, msg.as_string())
+        smtp.sendmail(email, recipients, msg.as_string())
 
-    print(f"✅ Email sent to {to}")
+    print(f"✅ Email sent to {', '.join(recipients)}")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Send email via Gmail")
-    parser.add_argument("--to", required=True, help="Recipient email address")
+    parser.add_argument("--to", required=True, nargs="+", help="Recipient email address(es)")
     parser.add_argument("--subject", required=True, help="Email subject")
     parser.add_argument("--body", required=True, help="Email body")
     parser.add_argument("--html", action="store_true", help="Send as HTML")
@@ -9,47 +9,75 @@ Usage:
 """
 
 import argparse
+import asyncio
+import base64
+import binascii
 import email
+import hashlib
 import imaplib
+import importlib.util
 import json
 import os
+import quopri
 import re
 import sys
-from email.header import decode_header
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parseaddr
 from pathlib import Path
 
-import anthropic
-import requests
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import dumps, load_creds, loads, parse_fetch
 
 ENV_FILE = Path("/home/ubuntu/agent/.env")
-CREDS_FILE = Path("/home/ubuntu/agent/gmail_app_password.json")
+CACHE_FILE = Path("/home/ubuntu/.claude-agent/triage_cache.json")
+CACHE_TTL_SECONDS = 30 * 24 * 3600
 LABEL_NAME = "Auto-Archived"
-
-CLASSIFY_PROMPT = """Classify this email as either "important" or "unimportant".
-
-Important: personal messages, bills/invoices, appointments, action-required items,
-security alerts, delivery updates for recent orders, work-related correspondence.
-
-Unimportant: marketing, newsletters, promotional offers, social media notifications,
-automated digests, spam, mailing list bulk sends, "we miss you" re-engagement.
-
-From: {sender}
-Subject: {subject}
-Date: {date}
-Body (first 300 chars): {body}
-
-Respond with ONLY a JSON object: {{"classification": "important" or "unimportant", "reason": "brief reason"}}"""
+FETCH_BATCH = 100  # UIDs per FETCH command; bigger batches gain little
+# Only the headers triage uses (plus the MIME ones needed to decode the
+# body) and the start of the body are downloaded; the classifier only sees
+# 300 chars of text.
+PEEK_BYTES = 2048
+FETCH_SPEC = (
+    "(BODY.PEEK[HEADER.FIELDS (FROM TO SUBJECT DATE LIST-UNSUBSCRIBE LIST-UNSUBSCRIBE-POST "
+    f"MIME-VERSION CONTENT-TYPE CONTENT-TRANSFER-ENCODING)] BODY.PEEK[TEXT]<0.{PEEK_BYTES}>)"
+)
+CLASSIFY_BATCH = 10  # emails per Haiku request
+CLASSIFY_TOKENS_PER_EMAIL = 50  # reply budget for one verdict
+CLASSIFY_CONCURRENCY = 10  # parallel Haiku requests, within API rate limits
+UNSUBSCRIBE_WORKERS = 16  # parallel unsubscribe requests
+
+_ENV_RE = re.compile(r"^[ \t]*([A-Za-z_]\w*)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+_ENCODED_WORD_RE = re.compile(r"=\?([^?]+)\?([bBqQ])\?([^?]*)\?=")
+_ENCODED_WORD_GAP_RE = re.compile(r"(?<=\?=)\s+(?==\?)")
+# End of a header block: a blank line, or one right at the start when a
+# MIME part has no headers at all
+_HEADER_END_RE = re.compile(rb"(?:^|\r?\n)\r?\n")
+_BOUNDARY_RE = re.compile(rb'boundary="?([^";\r\n]+)', re.IGNORECASE)
+_MIME_FIELD_RE = re.compile(
+    rb"^(content-type|content-transfer-encoding|content-disposition):[ \t]*([^;\s]+)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_UNSUB_URL_RE = re.compile(r"<(https?://[^>]+)>")
+_SUBJECT_PREFIX_RE = re.compile(r"^(\s*(re|fwd?|fw)\s*:)+", re.IGNORECASE)
+_SUBJECT_TAIL_RE = re.compile(r"[\s\d#/.,:-]+$")  # issue numbers, dates
+
+CLASSIFY_PROMPT = """Classify each email below as important (personal, bills, appointments, action required, security alerts, recent order deliveries, work) or unimportant (marketing, newsletters, promotions, social notifications, digests, spam, bulk mail, re-engagement).
+{emails}
+Reply ONLY with a JSON array, one object per email: [{{"id": <ID>, "classification": "important|unimportant", "reason": "<10 words"}}]"""
+EMAIL_ENTRY = "ID {id}\nFrom: {sender}\nSubject: {subject}\nBody: {body}"
 
 
 def load_env():
-    """Load environment variables from .env file."""
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    os.environ.setdefault(key.strip(), value.strip())
+    """Load environment variables from .env file, unless the API key is already set."""
+    if "ANTHROPIC_API_KEY" in os.environ:
+        return
+    try:
+        text = ENV_FILE.read_text()
+    except FileNotFoundError:
+        return
+    for key, value in _ENV_RE.findall(text):
+        os.environ.setdefault(key, value)
 
 
 def get_anthropic_client():
@@ -59,44 +87,130 @@ def get_anthropic_client():
         raise RuntimeError(
             "ANTHROPIC_API_KEY not set. Add it to /home/ubuntu/agent/.env"
         )
-    return anthropic.Anthropic(api_key=api_key)
+    import anthropic  # deferred: heavy, and not needed before classification
 
+    # The SDK's httpx client already keeps connections alive; with h2
+    # installed, the concurrent classifications also share one HTTP/2
+    # connection instead of opening one TLS connection each.
+    kwargs = {}
+    if importlib.util.find_spec("h2") is not None:
+        kwargs["http_client"] = anthropic.DefaultAsyncHttpxClient(http2=True)
+    return anthropic.AsyncAnthropic(api_key=api_key, **kwargs)
 
-def load_creds():
-    with open(CREDS_FILE) as f:
-        c = json.load(f)
-    return c["email"], c["app_password"].replace(" ", "")
+
+def _decode_word(match):
+    charset, encoding, text = match.groups()
+    try:
+        if encoding in "bB":
+            data = base64.b64decode(text + "=" * (-len(text) % 4))
+        else:
+            data = quopri.decodestring(text.encode("ascii", "replace"), header=True)
+    except binascii.Error:
+        return match.group()
+    try:
+        return data.decode(charset.partition("*")[0], errors="replace")  # "utf-8*en"
+    except LookupError:  # unknown charset label
+        return data.decode("utf-8", errors="replace")
 
 
 def decode_str(s):
     if s is None:
         return ""
-    parts = decode_header(s)
-    result = []
-    for part, enc in parts:
-        if isinstance(part, bytes):
-            result.append(part.decode(enc or "utf-8", errors="replace"))
+    if "=?" not in s:
+        return s  # plain header, nothing to decode (the common case)
+    # Whitespace between adjacent encoded words is not part of the text
+    return _ENCODED_WORD_RE.sub(_decode_word, _ENCODED_WORD_GAP_RE.sub("", s))
+
+
+def _mime_fields(headers):
+    """Map lowercased MIME header names to their lowercased main value."""
+    return {name.lower(): value.lower() for name, value in _MIME_FIELD_RE.findall(headers)}
+
+
+def _decode_payload(payload, cte):
+    if cte == b"base64":
+        # A peeked prefix may end mid-quartet; decode the whole quartets
+        data = b"".join(payload.split())
+        try:
+            payload = binascii.a2b_base64(data[:len(data) // 4 * 4])
+        except binascii.Error:
+            return ""
+    elif cte == b"quoted-printable":
+        payload = quopri.decodestring(payload)
+    return payload.decode("utf-8", errors="replace")
+
+
+def _split_headers(raw):
+    """Split raw MIME bytes into (headers, body) at the first blank line."""
+    blank = _HEADER_END_RE.search(raw)
+    if blank is None:
+        return raw, b""
+    return raw[:blank.start()], raw[blank.end():]
+
+
+def _multipart_text(headers, body):
+    boundary = _BOUNDARY_RE.search(headers)
+    if boundary is None:
+        return ""
+    # Element 0 is the preamble; a part starting with "--" is the close
+    for part in body.split(b"--" + boundary.group(1))[1:]:
+        if part.startswith(b"--"):
+            break
+        # Drop the line break ending the boundary line
+        if part.startswith(b"\r\n"):
+            part = part[2:]
+        elif part.startswith(b"\n"):
+            part = part[1:]
+        part_headers, part_body = _split_headers(part)
+        fields = _mime_fields(part_headers)
+        if fields.get(b"content-disposition") == b"attachment":
+            continue
+        ctype = fields.get(b"content-type", b"text/plain")
+        if ctype.startswith(b"multipart/"):
+            text = _multipart_text(part_headers, part_body)
+        elif ctype == b"text/plain":
+            if part_body.endswith(b"\r\n"):
+                part_body = part_body[:-2]  # belongs to the next delimiter
+            text = _decode_payload(part_body, fields.get(b"content-transfer-encoding"))
         else:
-            result.append(part)
-    return "".join(result)
-
-
-def get_body(msg):
-    if msg.is_multipart():
-        for part in msg.walk():
-            ct = part.get_content_type()
-            cd = str(part.get("Content-Disposition", ""))
-            if ct == "text/plain" and "attachment" not in cd:
-                payload = part.get_payload(decode=True)
-                if payload:
-                    return payload.decode("utf-8", errors="replace")
-    else:
-        payload = msg.get_payload(decode=True)
-        if payload:
-            return payload.decode("utf-8", errors="replace")
+            continue
+        if text:
+            return text
     return ""
 
 
+def is_multipart(headers):
+    return _mime_fields(headers).get(b"content-type", b"").startswith(b"multipart/")
+
+
+def get_body(headers, body):
+    """Return the message's (first non-attachment text/plain) body text.
+
+    Works on the raw header block and body bytes by scanning for MIME
+    boundaries, rather than building an email.message object tree.
+    """
+    if is_multipart(headers):
+        return _multipart_text(headers, body)
+    return _decode_payload(body, _mime_fields(headers).get(b"content-transfer-encoding"))
+
+
+def connect_imap(user, password):
+    """Log in to Gmail over IMAP and select the inbox."""
+    imap = imaplib.IMAP4_SSL("imap.gmail.com", 993)
+    imap.login(user, password)
+    imap.select("INBOX")
+    return imap
+
+
+def fetch_batched(imap, uids, spec):
+    """UID FETCH `spec` for uids, FETCH_BATCH at a time; return parse_fetch() output."""
+    fetched = {}
+    for i in range(0, len(uids), FETCH_BATCH):
+        _, msg_data = imap.uid("fetch", b",".join(uids[i:i + FETCH_BATCH]), spec)
+        fetched.update(parse_fetch(msg_data))
+    return fetched
+
+
 def fetch_emails(imap, count, unread_only):
     """Fetch emails using UIDs for stable references."""
     if unread_only:
@@ -107,18 +221,39 @@ def fetch_emails(imap, count, unread_only):
     uids = data[0].split()
     uids = uids[-count:]  # Most recent N
 
+    # One FETCH per batch of UIDs rather than a round-trip per message
+    messages = {}
+    bodies = {}
+    fallback = []
+    for uid, parts in fetch_batched(imap, uids, FETCH_SPEC).items():
+        headers = parts.get("header", b"")
+        messages[uid] = email.message_from_bytes(headers)
+        bodies[uid] = get_body(headers, parts.get("text", b""))
+        # The plain-text part may start beyond the peeked prefix (e.g. after
+        # a large HTML alternative); fetch those few messages in full. A
+        # prefix shorter than PEEK_BYTES is the whole TEXT, so there is
+        # nothing more to find.
+        if not bodies[uid] and is_multipart(headers) and len(parts.get("text", b"")) >= PEEK_BYTES:
+            fallback.append(uid)
+
+    for uid, parts in fetch_batched(imap, fallback, "(BODY.PEEK[])").items():
+        if "full" in parts:
+            headers, body = _split_headers(parts["full"])
+            messages[uid] = email.message_from_bytes(headers)
+            bodies[uid] = get_body(headers, body)
+
     emails = []
     for uid in reversed(uids):
-        _, msg_data = imap.uid("fetch", uid, "(RFC822)")
-        raw = msg_data[0][1]
-        msg = email.message_from_bytes(raw)
+        msg = messages.get(uid)
+        if msg is None:
+            continue  # expunged since the search
         emails.append({
             "uid": uid,
             "from": decode_str(msg["From"]),
             "to": decode_str(msg["To"]),
             "subject": decode_str(msg["Subject"]),
             "date": msg["Date"],
-            "body": get_body(msg)[:300],
+            "body": bodies[uid][:300],
             "list_unsubscribe": msg.get("List-Unsubscribe", ""),
             "list_unsubscribe_post": msg.get("List-Unsubscribe-Post", ""),
         })
@@ -126,36 +261,143 @@ def fetch_emails(imap, count, unread_only):
     return emails
 
 
-def classify_emails(emails, client):
-    """Classify emails using Claude Haiku."""
-    for em in emails:
-        prompt = CLASSIFY_PROMPT.format(
-            sender=em["from"],
-            subject=em["subject"],
-            date=em["date"],
-            body=em["body"],
-        )
-        response = client.messages.create(
+def parse_json_reply(text):
+    """Parse the JSON array (or object) in a model reply, tolerating text around it."""
+    try:
+        return loads(text)
+    except json.JSONDecodeError:
+        # Haiku may wrap it in markdown or text
+        starts = [i for i in (text.find("["), text.find("{")) if i >= 0]
+        end = max(text.rfind("]"), text.rfind("}"))
+        return loads(text[min(starts, default=0):end + 1])
+
+
+def load_cache():
+    """Load cached classifications, dropping entries older than CACHE_TTL_SECONDS."""
+    try:
+        with open(CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    cutoff = time.time() - CACHE_TTL_SECONDS
+    return {k: v for k, v in cache.items() if v.get("ts", 0) >= cutoff}
+
+
+def save_cache(cache):
+    """Write the classification cache atomically; failures only warn."""
+    tmp = CACHE_FILE.with_suffix(".tmp")
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp, CACHE_FILE)
+    except OSError as exc:
+        print(f"Warning: could not write {CACHE_FILE}: {exc}", file=sys.stderr)
+
+
+def cache_key(em):
+    """Key bulk mail by sender domain + normalized subject; None if not cacheable.
+
+    Only mail carrying List-Unsubscribe (newsletters, marketing) is cached:
+    that is where the same sender/subject recurs, and it keeps one personal
+    message's verdict from being reused for another sender at the same
+    domain (e.g. gmail.com).
+    """
+    if not em.get("list_unsubscribe"):
+        return None
+    domain = parseaddr(em["from"])[1].rpartition("@")[2].lower()
+    subject = _SUBJECT_PREFIX_RE.sub("", em["subject"]).lower()
+    subject = _SUBJECT_TAIL_RE.sub("", subject).strip()
+    return hashlib.sha1(f"{domain}|{subject}".encode()).hexdigest()
+
+
+async def classify_batch(batch, client, semaphore):
+    """Classify up to CLASSIFY_BATCH emails with one Claude Haiku call.
+
+    Returns a list with, per email, whether the reply held a verdict for it.
+    Token usage is split evenly across the batch.
+    """
+    prompt = CLASSIFY_PROMPT.format(emails="\n---\n".join(
+        EMAIL_ENTRY.format(id=i, sender=em["from"], subject=em["subject"], body=em["body"])
+        for i, em in enumerate(batch)
+    ))
+    async with semaphore:
+        response = await client.messages.create(
             model="claude-haiku-4-5-20251001",
-            max_tokens=100,
+            max_tokens=CLASSIFY_TOKENS_PER_EMAIL * len(batch),
             messages=[{"role": "user", "content": prompt}],
         )
-        text = response.content[0].text.strip()
-        # Extract JSON from response (Haiku may wrap it in markdown or text)
-        json_match = re.search(r"\{[^}]+\}", text)
-        try:
-            result = json.loads(json_match.group()) if json_match else json.loads(text)
-            em["classification"] = result.get("classification", "important")
-            em["reason"] = result.get("reason", "")
-        except (json.JSONDecodeError, AttributeError):
-            # Default to important (safe) if response isn't valid JSON
+    try:
+        verdicts = parse_json_reply(response.content[0].text.strip())
+    except json.JSONDecodeError:
+        verdicts = []
+    if isinstance(verdicts, dict):
+        verdicts = [verdicts]
+    by_id = {str(v.get("id")): v for v in verdicts if isinstance(v, dict)}
+
+    parsed = []
+    input_share, input_extra = divmod(response.usage.input_tokens, len(batch))
+    output_share, output_extra = divmod(response.usage.output_tokens, len(batch))
+    for i, em in enumerate(batch):
+        verdict = by_id.get(str(i), {})
+        if verdict.get("classification") in ("important", "unimportant"):
+            em["classification"] = verdict["classification"]
+            em["reason"] = verdict.get("reason", "")
+            parsed.append(True)
+        else:
+            # Default to important (safe) if the reply has no usable verdict
             em["classification"] = "important"
             em["reason"] = "Could not parse classification, defaulting to important"
-        em["input_tokens"] = response.usage.input_tokens
-        em["output_tokens"] = response.usage.output_tokens
+            parsed.append(False)
+        em["input_tokens"] = input_share + (i < input_extra)
+        em["output_tokens"] = output_share + (i < output_extra)
+    return parsed
+
+
+async def classify_emails(emails, client, cache):
+    """Classify emails in batches of CLASSIFY_BATCH, at most CLASSIFY_CONCURRENCY in flight.
+
+    Emails with a fresh entry in `cache` (see cache_key) skip the API call;
+    new clean classifications are added to it.
+    """
+    pending = []
+    for em in emails:
+        key = cache_key(em)
+        hit = cache.get(key) if key else None
+        if hit:
+            em["classification"] = hit["classification"]
+            em["reason"] = hit["reason"]
+            em["input_tokens"] = em["output_tokens"] = 0
+            em["cached"] = True
+        else:
+            pending.append((em, key))
+
+    batches = [pending[i:i + CLASSIFY_BATCH] for i in range(0, len(pending), CLASSIFY_BATCH)]
+    semaphore = asyncio.Semaphore(CLASSIFY_CONCURRENCY)
+    results = await asyncio.gather(
+        *(classify_batch([em for em, _ in batch], client, semaphore) for batch in batches),
+        return_exceptions=True,
+    )
+    now = time.time()
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            # Default to important (safe) if the request itself failed
+            for em, _ in batch:
+                em["classification"] = "important"
+                em["reason"] = f"Classification failed ({type(result).__name__}), defaulting to important"
+            continue
+        for (em, key), parsed in zip(batch, result):
+            if parsed and key:
+                cache[key] = {"classification": em["classification"], "reason": em["reason"], "ts": now}
     return emails
 
 
+async def classify_with_client(emails, cache):
+    """Run classify_emails() with a client that is closed before the event loop is."""
+    async with get_anthropic_client() as client:
+        return await classify_emails(emails, client, cache)
+
+
 def ensure_label(imap, label_name):
     """Create Gmail label if it doesn't exist."""
     _, folders = imap.list()
@@ -168,28 +410,27 @@ def ensure_label(imap, label_name):
 def archive_emails(imap, emails):
     """Archive unimportant emails: copy to label, remove from inbox."""
     ensure_label(imap, LABEL_NAME)
-    archived = []
-    for em in emails:
-        if em["classification"] != "unimportant":
-            continue
-        uid = em["uid"]
-        imap.uid("copy", uid, LABEL_NAME)
-        imap.uid("store", uid, "+FLAGS", "\\Deleted")
-        archived.append(em["subject"])
-    if archived:
-        imap.expunge()
-    return archived
-
-
-def try_unsubscribe(em):
+    unimportant = [em for em in emails if em["classification"] == "unimportant"]
+    if not unimportant:
+        return []
+    # UID COPY/STORE take a whole UID set: three commands in total, not 2N + 1
+    uid_set = b",".join(em["uid"] for em in unimportant)
+    imap.uid("copy", uid_set, LABEL_NAME)
+    imap.uid("store", uid_set, "+FLAGS", "\\Deleted")
+    imap.expunge()
+    return [em["subject"] for em in unimportant]
+
+
+def try_unsubscribe(em, session):
     """Attempt to unsubscribe using List-Unsubscribe header. Returns status string."""
+    import requests
     header = em.get("list_unsubscribe", "")
     post_header = em.get("list_unsubscribe_post", "")
     if not header:
         return "no_header"
 
     # Extract URLs from header (format: <url1>, <url2>)
-    urls = re.findall(r"<(https?://[^>]+)>", header)
+    urls = _UNSUB_URL_RE.findall(header)
     if not urls:
         return "mailto_only"
 
@@ -198,7 +439,7 @@ def try_unsubscribe(em):
     try:
         # RFC 8058 one-click: POST with List-Unsubscribe=One-Click-Unsubscribe
         if post_header and "One-Click" in post_header:
-            resp = requests.post(
+            resp = session.post(
                 https_url,
                 data={"List-Unsubscribe": "One-Click-Unsubscribe"},
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
@@ -210,7 +451,7 @@ def try_unsubscribe(em):
             return f"oneclick_failed_{resp.status_code}"
 
         # Fallback: GET on HTTPS URL
-        resp = requests.get(https_url, timeout=15, allow_redirects=True)
+        resp = session.get(https_url, timeout=15, allow_redirects=True)
         if resp.status_code < 400:
             return "unsubscribed_get"
         return f"get_failed_{resp.status_code}"
@@ -220,23 +461,32 @@ def try_unsubscribe(em):
 
 
 def run_unsubscribe(emails):
-    """Attempt unsubscribe for all unimportant emails."""
-    results = []
-    for em in emails:
-        if em["classification"] != "unimportant":
-            continue
-        status = try_unsubscribe(em)
-        results.append({
-            "from": em["from"],
-            "subject": em["subject"],
-            "status": status,
-        })
-    return results
+    """Attempt unsubscribe for all unimportant emails, in parallel."""
+    unimportant = [em for em in emails if em["classification"] == "unimportant"]
+    if not unimportant:
+        return []
+
+    import requests  # deferred: dry runs never unsubscribe
+
+    workers = min(UNSUBSCRIBE_WORKERS, len(unimportant))
+    # One session for all workers, so senders that share an unsubscribe
+    # host reuse pooled connections instead of a new TLS handshake each
+    with requests.Session() as session:
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=workers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            statuses = list(pool.map(lambda em: try_unsubscribe(em, session), unimportant))
+
+    return [
+        {"from": em["from"], "subject": em["subject"], "status": status}
+        for em, status in zip(unimportant, statuses)
+    ]
 
 
 def emit(data):
     """Write JSON output to stdout."""
-    sys.stdout.write(json.dumps(data, indent=2, ensure_ascii=False))
+    sys.stdout.write(dumps(data, pretty=True))
     sys.stdout.write("\n")
 
 
@@ -251,35 +501,41 @@ def main():
     load_env()
     user, password = load_creds()
 
-    # Phase 1: Fetch all emails
-    with imaplib.IMAP4_SSL("imap.gmail.com", 993) as imap:
-        imap.login(user, password)
-        imap.select("INBOX")
+    # One IMAP session serves both fetching and archiving
+    imap = connect_imap(user, password)
+    try:
+        # Phase 1: Fetch all emails
         emails = fetch_emails(imap, args.count, args.unread)
 
-    if not emails:
-        emit({"emails": [], "summary": "No emails to triage"})
-        return
-
-    # Phase 2: Classify with Haiku
-    client = get_anthropic_client()
-    classify_emails(emails, client)
-
-    important = [e for e in emails if e["classification"] == "important"]
-    unimportant = [e for e in emails if e["classification"] == "unimportant"]
-
-    # Phase 3: Archive + Unsubscribe (unless dry run)
-    archived = []
-    unsub_results = []
+        if not emails:
+            emit({"emails": [], "summary": "No emails to triage"})
+            return
 
-    if not args.dry_run and unimportant:
-        with imaplib.IMAP4_SSL("imap.gmail.com", 993) as imap:
-            imap.login(user, password)
-            imap.select("INBOX")
+        # Phase 2: Classify with Haiku
+        cache = load_cache()
+        asyncio.run(classify_with_client(emails, cache))
+        save_cache(cache)
+
+        important = [e for e in emails if e["classification"] == "important"]
+        unimportant = [e for e in emails if e["classification"] == "unimportant"]
+
+        # Phase 3: Archive (unless dry run)
+        archived = []
+        if not args.dry_run and unimportant:
+            # The session sat idle during classification; reconnect if the
+            # server has dropped it meanwhile.
+            try:
+                imap.noop()
+            except (imaplib.IMAP4.abort, OSError):
+                imap = connect_imap(user, password)
             archived = archive_emails(imap, emails)
+    finally:
+        imap.logout()
 
-        if not args.no_unsubscribe:
-            unsub_results = run_unsubscribe(emails)
+    # Phase 4: Unsubscribe (unless dry run)
+    unsub_results = []
+    if not args.dry_run and unimportant and not args.no_unsubscribe:
+        unsub_results = run_unsubscribe(emails)
 
     # Build summary
     total_input = sum(e.get("input_tokens", 0) for e in emails)
@@ -293,6 +549,7 @@ def main():
             "important": len(important),
             "unimportant": len(unimportant),
             "archived": len(archived),
+            "cached": sum(1 for e in emails if e.get("cached")),
             "dry_run": args.dry_run,
             "cost_usd": round(cost, 6),
             "tokens": {"input": total_input, "output": total_output},
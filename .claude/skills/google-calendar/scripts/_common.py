@@ -1,21 +1,48 @@
-"""Shared Google Calendar auth helper — service account."""
+"""Shared Google Calendar helpers — service account auth, API client, event formatting, JSON output."""
 import sys
 import json
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 # Add installed packages to path
 PACKAGES_PATH = "/home/ubuntu/.claude-agent/python-packages/lib/python3.12/site-packages"
 if PACKAGES_PATH not in sys.path:
     sys.path.insert(0, PACKAGES_PATH)
 
-from google.oauth2 import service_account
+try:
+    import orjson  # several times faster than json on large payloads
+except ImportError:
+    orjson = None
 
 SERVICE_ACCOUNT_PATH = Path("/home/ubuntu/.claude-agent/google-service-account.json")
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
+TIMEZONE = "Australia/Melbourne"
+
+# Partial response for events().list: just what format_event reads
+EVENT_LIST_FIELDS = "items(id,summary,start,end,location,description,attendees/email,htmlLink),nextPageToken"
+
+
+@lru_cache(maxsize=None)
+def get_tz(name: str = TIMEZONE) -> ZoneInfo:
+    """Return the ZoneInfo for name (default TIMEZONE), built once per process."""
+    return ZoneInfo(name)
+
+
+def dumps(obj, pretty: bool = False) -> str:
+    """Serialize obj to JSON text, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None,
+                      separators=None if pretty else (",", ":"))
 
 
 def get_credentials():
     """Load service account credentials."""
+    # Deferred: ical_fetch imports this module but never authenticates
+    from google.oauth2 import service_account
+
     if not SERVICE_ACCOUNT_PATH.exists():
         print(json.dumps({"error": f"Service account file not found: {SERVICE_ACCOUNT_PATH}"}))
         sys.exit(1)
@@ -28,3 +55,96 @@ def get_credentials():
     except Exception as e:
         print(json.dumps({"error": f"Failed to load service account: {e}"}))
         sys.exit(1)
+
+
+def _response_model():
+    """JsonModel parsing API responses with orjson, or None (the default
+    stdlib model) when orjson isn't installed."""
+    if orjson is None:
+        return None
+    from googleapiclient.model import JsonModel
+
+    class OrjsonModel(JsonModel):
+        def deserialize(self, content):
+            try:
+                return orjson.loads(content)  # takes the response bytes as-is
+            except orjson.JSONDecodeError:
+                return super().deserialize(content)  # e.g. an HTML error page
+
+    return OrjsonModel()
+
+
+@lru_cache(maxsize=1)
+def build_calendar_service():
+    """Build the Google Calendar API v3 service, once per process.
+
+    Uses the discovery document bundled with googleapiclient, so building
+    the client needs no network fetch or discovery-cache lookup. Responses
+    are parsed with orjson when it is installed.
+    """
+    # Deferred: googleapiclient is a heavy import
+    from googleapiclient.discovery import build
+
+    return build("calendar", "v3", credentials=get_credentials(), model=_response_model(),
+                 static_discovery=True, cache_discovery=False)
+
+
+def format_event(event: dict, calendar_id: str) -> dict:
+    """Flatten a Calendar API event resource into the scripts' output shape."""
+    start = event.get("start") or {}
+    end = event.get("end") or {}
+    return {
+        "id": event.get("id", ""),
+        "summary": event.get("summary", "(No title)"),
+        "start": start.get("dateTime") or start.get("date", ""),
+        "end": end.get("dateTime") or end.get("date", ""),
+        "location": event.get("location", ""),
+        "description": event.get("description", ""),
+        "attendees": [a.get("email", "") for a in event.get("attendees", ())],
+        "calendar_id": calendar_id,
+        "html_link": event.get("htmlLink", ""),
+    }
+
+
+def _start_key(event: dict, tz) -> datetime:
+    """Sort key for a formatted event: its start, all-day dates at midnight in tz."""
+    if not event["start"]:
+        return datetime.min.replace(tzinfo=tz)
+    start = datetime.fromisoformat(event["start"])
+    return start if start.tzinfo else start.replace(tzinfo=tz)
+
+
+def list_events(service, calendar_ids: list[str], tz, **params) -> list[dict]:
+    """Run events().list(**params) on each calendar; return formatted events.
+
+    Several calendars are queried in one batch HTTP request and their events
+    merged in start order (all-day dates taken in tz). Raises the first API
+    error.
+    """
+    if len(calendar_ids) == 1:
+        result = service.events().list(calendarId=calendar_ids[0], **params).execute()
+        return [format_event(e, calendar_ids[0]) for e in result.get("items", [])]
+
+    results = {}
+    errors = []
+
+    def collect(request_id, response, exception):
+        if exception is not None:
+            errors.append(exception)
+        else:
+            results[int(request_id)] = response
+
+    batch_request = service.new_batch_http_request(callback=collect)
+    for i, calendar_id in enumerate(calendar_ids):
+        batch_request.add(service.events().list(calendarId=calendar_id, **params), request_id=str(i))
+    batch_request.execute()
+    if errors:
+        raise errors[0]
+
+    events = [
+        format_event(e, calendar_ids[i])
+        for i in sorted(results)
+        for e in results[i].get("items", [])
+    ]
+    events.sort(key=lambda e: _start_key(e, tz))
+    return events
@@ -5,16 +5,11 @@ import json
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _common import get_credentials, PACKAGES_PATH
-if PACKAGES_PATH not in sys.path:
-    sys.path.insert(0, PACKAGES_PATH)
-
-from googleapiclient.discovery import build
+from _common import build_calendar_service, dumps
 
 
 def main():
-    creds = get_credentials()
-    service = build("calendar", "v3", credentials=creds)
+    service = build_calendar_service()
 
     try:
         result = service.calendarList().list().execute()
@@ -33,7 +28,7 @@ def main():
         for c in result.get("items", [])
     ]
 
-    print(json.dumps({"calendars": calendars, "count": len(calendars)}, indent=2))
+    print(dumps({"calendars": calendars, "count": len(calendars)}, pretty=True))
 
 
 if __name__ == "__main__":
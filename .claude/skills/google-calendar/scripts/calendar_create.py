@@ -6,11 +6,7 @@ import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _common import get_credentials, PACKAGES_PATH
-if PACKAGES_PATH not in sys.path:
-    sys.path.insert(0, PACKAGES_PATH)
-
-from googleapiclient.discovery import build
+from _common import build_calendar_service, dumps
 
 
 def main():
@@ -42,8 +38,7 @@ def main():
     if args.attendees:
         event["attendees"] = [{"email": e} for e in args.attendees]
 
-    creds = get_credentials()
-    service = build("calendar", "v3", credentials=creds)
+    service = build_calendar_service()
 
     try:
         created = service.events().insert(
@@ -55,14 +50,14 @@ def main():
         print(json.dumps({"error": str(e)}))
         sys.exit(1)
 
-    print(json.dumps({
+    print(dumps({
         "ok": True,
         "id": created.get("id"),
         "summary": created.get("summary"),
         "start": created.get("start"),
         "end": created.get("end"),
         "html_link": created.get("htmlLink"),
-    }, indent=2))
+    }, pretty=True))
 
 
 if __name__ == "__main__":
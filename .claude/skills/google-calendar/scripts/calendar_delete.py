@@ -6,11 +6,7 @@ import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _common import get_credentials, PACKAGES_PATH
-if PACKAGES_PATH not in sys.path:
-    sys.path.insert(0, PACKAGES_PATH)
-
-from googleapiclient.discovery import build
+from _common import build_calendar_service
 
 
 def main():
@@ -19,8 +15,7 @@ def main():
     parser.add_argument("--calendar", default="primary", help="Calendar ID (default: primary)")
     args = parser.parse_args()
 
-    creds = get_credentials()
-    service = build("calendar", "v3", credentials=creds)
+    service = build_calendar_service()
 
     try:
         service.events().delete(calendarId=args.calendar, eventId=args.event_id).execute()
@@ -6,11 +6,7 @@ import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _common import get_credentials, PACKAGES_PATH
-if PACKAGES_PATH not in sys.path:
-    sys.path.insert(0, PACKAGES_PATH)
-
-from googleapiclient.discovery import build
+from _common import build_calendar_service, dumps
 
 
 def main():
@@ -25,8 +21,7 @@ def main():
     parser.add_argument("--timezone", default="Australia/Melbourne", help="Timezone")
     args = parser.parse_args()
 
-    creds = get_credentials()
-    service = build("calendar", "v3", credentials=creds)
+    service = build_calendar_service()
 
     try:
         event = service.events().get(calendarId=args.calendar, eventId=args.event_id).execute()
@@ -59,14 +54,14 @@ def main():
         print(json.dumps({"error": str(e)}))
         sys.exit(1)
 
-    print(json.dumps({
+    print(dumps({
         "ok": True,
         "id": updated.get("id"),
         "summary": updated.get("summary"),
         "start": updated.get("start"),
         "end": updated.get("end"),
         "html_link": updated.get("htmlLink"),
-    }, indent=2))
+    }, pretty=True))
 
 
 if __name__ == "__main__":
@@ -1,39 +1,172 @@
 #!/usr/bin/env python3
 """Fetch and parse an iCal feed, returning upcoming events as JSON."""
 import os
+import re
 import sys
 import json
 import argparse
+import gzip
+import tempfile
+import urllib.error
 import urllib.request
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
 PACKAGES_PATH = "/home/ubuntu/.claude-agent/python-packages/lib/python3.12/site-packages"
 if PACKAGES_PATH not in sys.path:
     sys.path.insert(0, PACKAGES_PATH)
 
-import icalendar
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import dumps, get_tz
 
 ICAL_URL = os.environ.get("ICAL_URL", "")
-TIMEZONE = "Australia/Melbourne"
 
+# Last feed body plus its validators, for conditional GETs
+FEED_CACHE_PATH = Path("/home/ubuntu/.claude-agent/ical-cache.json")
+FEED_BODY_PATH = FEED_CACHE_PATH.with_suffix(".ics")
 
-def fetch_and_parse(url: str, days: int = 7, max_events: int = 50) -> dict:
-    tz = ZoneInfo(TIMEZONE)
-    now = datetime.now(tz=tz)
-    cutoff = now + timedelta(days=days)
+# RFC 5545 line folding: CRLF (or bare LF) followed by a space or tab
+_FOLD_RE = re.compile(r"\r?\n[ \t]")
+_NAME_RE = re.compile(r"[^;:]*")
+_TEXT_ESCAPE_RE = re.compile(r"\\([\\;,nN])")
+_TEXT_ESCAPES = {"\\": "\\", ";": ";", ",": ",", "n": "\n", "N": "\n"}
 
-    try:
-        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            data = resp.read()
-    except Exception as e:
-        return {"error": f"Failed to fetch iCal: {e}"}
+# Properties read from each VEVENT; everything else is skipped unparsed
+EVENT_PROPERTIES = {"DTSTART", "DTEND", "SUMMARY", "LOCATION", "DESCRIPTION", "UID"}
 
-    try:
-        cal = icalendar.Calendar.from_ical(data)
-    except Exception as e:
-        return {"error": f"Failed to parse iCal: {e}"}
+
+class UnsupportedFeed(ValueError):
+    """Raised when the fast parser meets something only icalendar handles."""
+
+
+def _split_property(line: str) -> tuple[str, dict, str]:
+    """Split a content line into (NAME, {PARAM: value}, value)."""
+    colon = line.find(":")
+    if colon < 0:
+        raise UnsupportedFeed(f"Malformed line: {line[:40]!r}")
+    head = line[:colon]
+    if '"' in head:
+        # A quoted parameter value may itself contain ":"
+        in_quotes = False
+        for colon, ch in enumerate(line):
+            if ch == '"':
+                in_quotes = not in_quotes
+            elif ch == ":" and not in_quotes:
+                break
+        head = line[:colon]
+    name, *params = head.split(";")
+    param_map = {}
+    for param in params:
+        key, _, value = param.partition("=")
+        param_map[key.upper()] = value.strip('"')
+    return name.upper(), param_map, line[colon + 1:]
+
+
+def _unescape_text(value: str) -> str:
+    return _TEXT_ESCAPE_RE.sub(lambda m: _TEXT_ESCAPES[m.group(1)], value)
+
+
+def _parse_dt(value: str, params: dict, tz: ZoneInfo) -> datetime:
+    """Parse a DATE or DATE-TIME value into an aware datetime in tz."""
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]), tzinfo=tz)
+
+    if len(value) not in (15, 16) or value[8] != "T":
+        raise UnsupportedFeed(f"Unsupported date-time: {value!r}")
+    if value.endswith("Z"):
+        zone = timezone.utc
+    elif "TZID" in params:
+        try:
+            zone = get_tz(params["TZID"])
+        except (KeyError, ValueError):
+            # Non-IANA TZID defined by the feed's own VTIMEZONE
+            raise UnsupportedFeed(f"Unknown TZID: {params['TZID']!r}")
+    else:
+        zone = tz  # floating time
+    dt = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                  int(value[9:11]), int(value[11:13]), int(value[13:15]), tzinfo=zone)
+    return dt.astimezone(tz)
+
+
+def parse_events(data: bytes, tz: ZoneInfo, now: datetime, cutoff: datetime) -> list[dict]:
+    """Scan VEVENTs line by line, keeping those starting within [now, cutoff].
+
+    Properties of an event are only decoded once its DTSTART is known to be
+    in range; anything else in the event is skipped. Raises UnsupportedFeed
+    (or ValueError on malformed values) when the feed needs icalendar.
+    """
+    text = _FOLD_RE.sub("", data.decode("utf-8", "replace"))
+    events = []
+    props = None   # raw (params, value) of the current VEVENT's properties
+    depth = 0      # components nested inside the current VEVENT (VALARM, ...)
+    skipping = False
+
+    for line in text.splitlines():
+        if props is None:
+            if line == "BEGIN:VEVENT":
+                props, depth, skipping = {}, 0, False
+            continue
+
+        if line.startswith("BEGIN:"):
+            depth += 1
+            continue
+        if line.startswith("END:"):
+            if depth:
+                depth -= 1
+                continue
+            if not skipping and "DTSTART" in props:
+                events.append(_event_from_props(props, tz))
+            props = None
+            continue
+        if skipping or depth:
+            continue
+
+        if _NAME_RE.match(line).group().upper() not in EVENT_PROPERTIES:
+            continue
+        name, params, value = _split_property(line)
+        if name == "DTSTART":
+            dt_start = _parse_dt(value, params, tz)
+            if not (now <= dt_start <= cutoff):
+                skipping = True  # fast-forward to END:VEVENT
+                continue
+            props[name] = dt_start
+        else:
+            props[name] = (params, value)
+
+    return events
+
+
+def _event_from_props(props: dict, tz: ZoneInfo) -> dict:
+    dt_end = None
+    if "DTEND" in props:
+        dt_end = _parse_dt(props["DTEND"][1], props["DTEND"][0], tz).isoformat()
+
+    def text(name, default=""):
+        return _unescape_text(props[name][1]) if name in props else default
+
+    return {
+        "summary": text("SUMMARY", "(No title)"),
+        "start": props["DTSTART"].isoformat(),
+        "end": dt_end,
+        "location": text("LOCATION"),
+        "description": text("DESCRIPTION"),
+        "uid": text("UID"),
+    }
+
+
+def _norm(dt: date | datetime, tz: ZoneInfo) -> datetime:
+    """Make an icalendar DATE or DATE-TIME value an aware datetime in tz."""
+    if type(dt) is date:
+        return datetime(dt.year, dt.month, dt.day, tzinfo=tz)
+    return dt.astimezone(tz) if dt.tzinfo else dt.replace(tzinfo=tz)
+
+
+def parse_events_icalendar(data: bytes, tz: ZoneInfo, now: datetime, cutoff: datetime) -> list[dict]:
+    """Parse the feed with icalendar (handles custom VTIMEZONEs and oddities)."""
+    import icalendar
+
+    cal = icalendar.Calendar.from_ical(data)
 
     events = []
     for component in cal.walk():
@@ -44,24 +177,11 @@ def fetch_and_parse(url: str, days: int = 7, max_events: int = 50) -> dict:
         if not start:
             continue
 
-        dt_start = start.dt
-        if isinstance(dt_start, date) and not isinstance(dt_start, datetime):
-            dt_start = datetime(dt_start.year, dt_start.month, dt_start.day, tzinfo=tz)
-        if dt_start.tzinfo is None:
-            dt_start = dt_start.replace(tzinfo=tz)
-        dt_start = dt_start.astimezone(tz)
-
+        dt_start = _norm(start.dt, tz)
         if not (now <= dt_start <= cutoff):
             continue
 
-        dt_end = None
-        if end:
-            dt_end = end.dt
-            if isinstance(dt_end, date) and not isinstance(dt_end, datetime):
-                dt_end = datetime(dt_end.year, dt_end.month, dt_end.day, tzinfo=tz)
-            if dt_end.tzinfo is None:
-                dt_end = dt_end.replace(tzinfo=tz)
-            dt_end = dt_end.astimezone(tz).isoformat()
+        dt_end = _norm(end.dt, tz).isoformat() if end else None
 
         events.append({
             "summary": str(component.get("SUMMARY", "(No title)")),
@@ -71,6 +191,86 @@ def fetch_and_parse(url: str, days: int = 7, max_events: int = 50) -> dict:
             "description": str(component.get("DESCRIPTION", "")),
             "uid": str(component.get("UID", "")),
         })
+    return events
+
+
+def _load_feed_cache(url: str) -> dict | None:
+    """Return the cached validators for url, if its body is cached too."""
+    try:
+        with open(FEED_CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("url") != url or not FEED_BODY_PATH.exists():
+        return None
+    return cache
+
+
+def _save_feed_cache(url: str, etag: str | None, last_modified: str | None, data: bytes):
+    """Store the feed body and validators atomically; failures only warn."""
+    try:
+        FEED_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        for path, payload in (
+            (FEED_BODY_PATH, data),
+            (FEED_CACHE_PATH, json.dumps({"url": url, "etag": etag, "last_modified": last_modified}).encode()),
+        ):
+            # A temp file of its own per write: concurrent runs (e.g. the
+            # daily briefing) must not swap one file's bytes into the other
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp",
+                                             delete=False) as tmp:
+                tmp.write(payload)
+            os.replace(tmp.name, path)
+    except OSError as e:
+        print(f"Warning: could not write {FEED_CACHE_PATH}: {e}", file=sys.stderr)
+
+
+def fetch_feed(url: str) -> bytes:
+    """Download the feed, or reuse the cached copy if the server answers 304."""
+    cache = _load_feed_cache(url)
+    # Calendar text compresses 5-10x; urllib leaves decoding to us
+    headers = {"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip"}
+    if cache:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=20) as resp:
+            data = resp.read()
+            if resp.headers.get("Content-Encoding", "").lower() == "gzip":
+                data = gzip.decompress(data)
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cache:
+            return FEED_BODY_PATH.read_bytes()
+        raise
+
+    if etag or last_modified:
+        _save_feed_cache(url, etag, last_modified, data)
+    return data
+
+
+def fetch_and_parse(url: str, days: int = 7, max_events: int = 50) -> dict:
+    tz = get_tz()
+    now = datetime.now(tz=tz)
+    cutoff = now + timedelta(days=days)
+
+    try:
+        data = fetch_feed(url)
+    except Exception as e:
+        return {"error": f"Failed to fetch iCal: {e}"}
+
+    try:
+        events = parse_events(data, tz, now, cutoff)
+    except ValueError:
+        # Custom time zones or unusual values: let icalendar handle the feed
+        try:
+            events = parse_events_icalendar(data, tz, now, cutoff)
+        except Exception as e:
+            return {"error": f"Failed to parse iCal: {e}"}
 
     events.sort(key=lambda e: e["start"])
     return {
@@ -89,7 +289,7 @@ def main():
     args = parser.parse_args()
 
     result = fetch_and_parse(args.url, args.days, args.max)
-    print(json.dumps(result, indent=2))
+    print(dumps(result, pretty=True))
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 """Shared Google Contacts auth helper — OAuth2 with stored refresh token."""
+import os
 import sys
 import json
+from functools import lru_cache
 from pathlib import Path
 
 # Add installed packages to path
@@ -8,15 +10,71 @@ PACKAGES_PATH = "/home/ubuntu/.claude-agent/python-packages/lib/python3.12/site-
 if PACKAGES_PATH not in sys.path:
     sys.path.insert(0, PACKAGES_PATH)
 
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+try:
+    import orjson  # several times faster than json on large payloads
+except ImportError:
+    orjson = None
 
 TOKEN_PATH = Path("/home/ubuntu/.claude-agent/google-contacts-token.json")
 CREDENTIALS_PATH = Path("/home/ubuntu/.claude-agent/google-credentials.json")
 SCOPES = ["https://www.googleapis.com/auth/contacts"]
 
 PERSON_FIELDS = "names,emailAddresses,phoneNumbers,organizations,addresses,biographies"
+# contacts_list doesn't report notes
+LIST_PERSON_FIELDS = "names,emailAddresses,phoneNumbers,organizations,addresses"
+
+# Partial-response selection of the person sub-fields the scripts read.
+# Without it every name, email, phone, ... value comes wrapped in its own
+# metadata/source block, which outweighs the data itself.
+PERSON_RESPONSE_FIELDS = (
+    "resourceName,etag,names(displayName,givenName,familyName),emailAddresses/value,"
+    "phoneNumbers/value,organizations(name,title),addresses/formattedValue,biographies/value"
+)
+
+# Last known etag per contact, so contacts_update can often skip fetching
+# the contact first (updateContact requires the current etag)
+ETAG_CACHE_PATH = Path("/home/ubuntu/.claude-agent/contacts-etags.json")
+ETAG_CACHE_MAX = 1000
+
+# connections.list hands out page tokens one at a time, so pages can't be
+# fetched in parallel; use the API's largest page size to need fewer of them.
+LIST_PAGE_SIZE = 1000
+
+
+def dumps(obj, pretty: bool = False) -> str:
+    """Serialize obj to JSON text, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None,
+                      separators=None if pretty else (",", ":"))
+
+
+def load_etags() -> dict:
+    """Return the cached {resource_name: etag} map (empty if unreadable)."""
+    try:
+        with open(ETAG_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def remember_etags(etags: dict):
+    """Merge {resource_name: etag} into the etag cache, keeping the newest
+    ETAG_CACHE_MAX entries; failures only warn."""
+    cached = load_etags()
+    for resource_name, etag in etags.items():
+        if etag:
+            cached.pop(resource_name, None)
+            cached[resource_name] = etag
+    cached = dict(list(cached.items())[-ETAG_CACHE_MAX:])
+    tmp = ETAG_CACHE_PATH.with_suffix(".tmp")
+    try:
+        ETAG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(cached, f)
+        os.replace(tmp, ETAG_CACHE_PATH)
+    except OSError as e:
+        print(f"Warning: could not write {ETAG_CACHE_PATH}: {e}", file=sys.stderr)
 
 
 def fail(msg: str):
@@ -25,8 +83,12 @@ def fail(msg: str):
     sys.exit(1)
 
 
-def get_credentials() -> Credentials:
+def get_credentials():
     """Load OAuth2 credentials, auto-refreshing if expired."""
+    # Deferred with googleapiclient: cached searches never need google-auth
+    from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
+
     if not TOKEN_PATH.exists():
         fail(
             f"Token file not found: {TOKEN_PATH}. "
@@ -51,7 +113,34 @@ def get_credentials() -> Credentials:
     return creds
 
 
+def _response_model():
+    """JsonModel parsing API responses with orjson, or None (the default
+    stdlib model) when orjson isn't installed."""
+    if orjson is None:
+        return None
+    from googleapiclient.model import JsonModel
+
+    class OrjsonModel(JsonModel):
+        def deserialize(self, content):
+            try:
+                return orjson.loads(content)  # takes the response bytes as-is
+            except orjson.JSONDecodeError:
+                return super().deserialize(content)  # e.g. an HTML error page
+
+    return OrjsonModel()
+
+
+@lru_cache(maxsize=1)
 def build_people_service():
-    """Build and return Google People API v1 service."""
+    """Build and return Google People API v1 service, once per process.
+
+    Uses the discovery document bundled with googleapiclient, so building
+    the client needs no network fetch or discovery-cache lookup. Responses
+    are parsed with orjson when it is installed.
+    """
+    # Deferred: googleapiclient is a heavy import
+    from googleapiclient.discovery import build
+
     creds = get_credentials()
-    return build("people", "v1", credentials=creds)
+    return build("people", "v1", credentials=creds, model=_response_model(),
+                 static_discovery=True, cache_discovery=False)
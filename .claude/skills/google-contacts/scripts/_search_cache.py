@@ -0,0 +1,61 @@
+"""Short-lived on-disk cache of contacts_search results, so a repeated query
+skips the API round trips and scoring."""
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+CACHE_PATH = Path("/home/ubuntu/.claude-agent/contacts-search-cache.json")
+TTL_SECONDS = 300
+
+
+def cache_key(*parts) -> str:
+    """Hash the parts identifying one search into a cache key."""
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def _load() -> dict:
+    """Load unexpired entries as {key: {"ts": float, "value": ...}}."""
+    try:
+        with open(CACHE_PATH) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    cutoff = time.time() - TTL_SECONDS
+    return {k: v for k, v in entries.items() if v.get("ts", 0) >= cutoff}
+
+
+def _save(entries: dict):
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp, CACHE_PATH)
+    except OSError as e:
+        print(f"Warning: could not write {CACHE_PATH}: {e}", file=sys.stderr)
+
+
+def get_cached(key: str):
+    """Return the cached value for key, or None if absent or expired."""
+    entry = _load().get(key)
+    return entry["value"] if entry else None
+
+
+def put_cached(key: str, value):
+    """Store value under key for TTL_SECONDS (expired entries are dropped)."""
+    entries = _load()
+    entries[key] = {"ts": time.time(), "value": value}
+    _save(entries)
+
+
+def clear_cached():
+    """Forget all cached results, e.g. after a contact was created or changed."""
+    try:
+        CACHE_PATH.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Warning: could not remove {CACHE_PATH}: {e}", file=sys.stderr)
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Create a new Google Contact."""
 import sys
-import json
 import argparse
 from pathlib import Path
 
@@ -10,7 +9,8 @@ if PACKAGES_PATH not in sys.path:
     sys.path.insert(0, PACKAGES_PATH)
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _common import build_people_service, fail, PERSON_FIELDS
+from _common import build_people_service, dumps, fail, remember_etags, PERSON_FIELDS
+from _search_cache import clear_cached
 
 
 if __name__ == "__main__":
@@ -48,11 +48,14 @@ if __name__ == "__main__":
     except Exception as e:
         fail(f"createContact API error: {e}")
 
+    clear_cached()  # cached search results may now be stale
+    remember_etags({result.get("resourceName", ""): result.get("etag")})
+
     names = result.get("names", [{}])
     name = names[0] if names else {}
-    print(json.dumps({
+    print(dumps({
         "ok": True,
         "resource_name": result.get("resourceName", ""),
         "display_name": name.get("displayName", ""),
         "message": f"Contact '{name.get('displayName', '')}' created.",
-    }, indent=2))
+    }, pretty=True))
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """List Google Contacts, optionally filtered by group."""
 import sys
-import json
 import argparse
 from pathlib import Path
 
@@ -10,7 +9,26 @@ if PACKAGES_PATH not in sys.path:
     sys.path.insert(0, PACKAGES_PATH)
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _common import build_people_service, fail, PERSON_FIELDS
+from _common import (
+    build_people_service, dumps, fail, LIST_PAGE_SIZE, LIST_PERSON_FIELDS, PERSON_RESPONSE_FIELDS,
+)
+
+
+def write_output(contacts: list[dict], group: str = ""):
+    """Write the result JSON to stdout one contact per line.
+
+    Streams the document instead of building it as one (possibly multi-MB)
+    string first.
+    """
+    out = sys.stdout
+    out.write(f'{{"count": {len(contacts)}, "contacts": [')
+    for i, contact in enumerate(contacts):
+        out.write(",\n  " if i else "\n  ")
+        out.write(dumps(contact))
+    out.write("\n]" if contacts else "]")
+    if group:
+        out.write(f', "group": {dumps(group)}')
+    out.write("}\n")
 
 
 def get_group_resource_name(service, group_name: str) -> str:
@@ -60,20 +78,39 @@ if __name__ == "__main__":
         member_names = list_group_members(service, group_resource, args.max)
 
         if not member_names:
-            print(json.dumps({"count": 0, "contacts": [], "group": args.group}, indent=2))
+            write_output([], args.group)
             sys.exit(0)
 
-        # Batch get (max 200 per request)
-        for i in range(0, len(member_names), 200):
-            batch = member_names[i:i + 200]
-            try:
-                result = service.people().getBatchGet(
-                    resourceNames=batch,
-                    personFields=PERSON_FIELDS,
-                ).execute()
-            except Exception as e:
-                fail(f"getBatchGet API error: {e}")
+        # getBatchGet takes at most 200 people; send all of those calls as
+        # one multipart batch request instead of a round-trip each.
+        results = {}
+        errors = []
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                errors.append(exception)
+            else:
+                results[int(request_id)] = response
 
+        batch_request = service.new_batch_http_request(callback=collect)
+        for i in range(0, len(member_names), 200):
+            batch_request.add(
+                service.people().getBatchGet(
+                    resourceNames=member_names[i:i + 200],
+                    personFields=LIST_PERSON_FIELDS,
+                    fields=f"responses/person({PERSON_RESPONSE_FIELDS})",
+                ),
+                request_id=str(i),
+            )
+        try:
+            batch_request.execute()
+        except Exception as e:
+            fail(f"getBatchGet API error: {e}")
+        if errors:
+            fail(f"getBatchGet API error: {errors[0]}")
+
+        for i in sorted(results):
+            result = results[i]
             for resp in result.get("responses", []):
                 person = resp.get("person", {})
                 names = person.get("names", [{}])
@@ -102,14 +139,15 @@ if __name__ == "__main__":
         sort_order = "LAST_NAME_ASCENDING" if args.sort == "name" else "LAST_MODIFIED_DESCENDING"
 
         while len(contacts) < args.max:
-            page_size = min(200, args.max - len(contacts))
+            page_size = min(LIST_PAGE_SIZE, args.max - len(contacts))
             try:
                 result = service.people().connections().list(
                     resourceName="people/me",
-                    personFields=PERSON_FIELDS,
+                    personFields=LIST_PERSON_FIELDS,
                     pageSize=page_size,
                     pageToken=page_token,
                     sortOrder=sort_order,
+                    fields=f"connections({PERSON_RESPONSE_FIELDS}),nextPageToken",
                 ).execute()
             except Exception as e:
                 fail(f"connections.list API error: {e}")
@@ -144,7 +182,4 @@ if __name__ == "__main__":
     if args.sort == "name":
         contacts.sort(key=lambda c: (c.get("given_name", "").lower(), c.get("family_name", "").lower()))
 
-    output = {"count": len(contacts), "contacts": contacts}
-    if args.group:
-        output["group"] = args.group
-    print(json.dumps(output, indent=2))
+    write_output(contacts, args.group)
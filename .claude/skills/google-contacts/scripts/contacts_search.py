@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """Search Google Contacts with fuzzy/partial matching."""
 import sys
+import os
 import json
 import argparse
 import re
-from difflib import SequenceMatcher
+from difflib import SequenceMatcher, get_close_matches
 from pathlib import Path
 
 # Bootstrap before local imports
@@ -13,11 +14,66 @@ if PACKAGES_PATH not in sys.path:
     sys.path.insert(0, PACKAGES_PATH)
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _common import build_people_service, fail, PERSON_FIELDS
+from _common import (
+    build_people_service, dumps, fail, remember_etags, LIST_PAGE_SIZE, PERSON_FIELDS, PERSON_RESPONSE_FIELDS,
+)
+from _search_cache import cache_key, get_cached, put_cached
+from contacts_trie import build_trie, load_indexes, prefix_matches, save_indexes
+
+try:
+    # Same Indel similarity as SequenceMatcher.ratio(), in C++ (0-100)
+    from rapidfuzz.fuzz import ratio as similarity
+    from rapidfuzz.process import extract
+
+    def close_matches(query: str, values: list[str], min_score: float) -> list[str]:
+        """Values at least min_score similar (0-100) to query."""
+        return [v for v, _, _ in extract(query, values, scorer=similarity, processor=None,
+                                         score_cutoff=min_score, limit=None)]
+except ImportError:
+    def similarity(a: str, b: str) -> float:
+        return SequenceMatcher(None, a, b).ratio() * 100
+
+    def close_matches(query: str, values: list[str], min_score: float) -> list[str]:
+        """Values at least min_score similar (0-100) to query."""
+        return get_close_matches(query, values, n=max(len(values), 1), cutoff=min_score / 100)
+
+try:
+    # pyahocorasick: finds any of several query words in one C pass per string
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+_NON_DIGIT_RE = re.compile(r"\D")
+
+# Address book snapshot for --method list: extracted contacts plus the People
+# API sync token, so later runs fetch only what changed since.
+CACHE_PATH = Path("/home/ubuntu/.claude-agent/contacts-cache.json")
+INDEX_PATH = CACHE_PATH.with_name("contacts-index.pickle")
+
+# Phone numbers are indexed by their last 10, 7 and 4 digits (full national
+# number, local number, extension-style tail)
+PHONE_SUFFIX_LENGTHS = (10, 7, 4)
+
+# Query words shorter than this are too unselective to shortlist contacts by
+MIN_QUERY_WORD = 2
+
+# fuzzy_score gives a substring match of a name or email 90, and a phone
+# number containing the query's digits 92; only a similarity above 90 to a
+# name, email local part or organization scores higher. Shortlists always
+# include those close spellings (see close_spelling_matches), so these are
+# the highest scores a contact left off a word/prefix or phone shortlist
+# can get.
+UNSHORTLISTED_MAX_SCORE = 90
+UNSHORTLISTED_PHONE_MAX_SCORE = 92
 
 
 def extract_contact(person: dict, score: int = 0) -> dict:
-    """Extract a flat contact dict from a People API person resource."""
+    """Extract a flat contact dict from a People API person resource.
+
+    Underscore-prefixed keys hold lowercased/digit-only copies of the
+    searchable fields for fuzzy_score; public() drops them for output.
+    """
     names = person.get("names", [{}])
     name = names[0] if names else {}
     emails = [e["value"] for e in person.get("emailAddresses", [])]
@@ -28,6 +84,7 @@ def extract_contact(person: dict, score: int = 0) -> dict:
     addr = addrs[0].get("formattedValue", "") if addrs else ""
     bios = person.get("biographies", [{}])
     notes = bios[0].get("value", "") if bios else ""
+    emails_lc = [e.lower() for e in emails]
 
     return {
         "resource_name": person.get("resourceName", ""),
@@ -41,12 +98,41 @@ def extract_contact(person: dict, score: int = 0) -> dict:
         "address": addr,
         "notes": notes,
         "score": score,
+        "_etag": person.get("etag", ""),
+        "_names_lc": [v.lower() for v in (name.get("displayName", ""), name.get("givenName", ""),
+                                          name.get("familyName", "")) if v],
+        "_emails_lc": emails_lc,
+        "_email_locals_lc": [e.split("@")[0] for e in emails_lc],
+        "_org_lc": org.get("name", "").lower(),
+        "_phone_digits": [digits_only(p) for p in phones],
     }
 
 
+def public(contact: dict) -> dict:
+    """Return the contact without its precomputed search fields."""
+    return {k: v for k, v in contact.items() if not k.startswith("_")}
+
+
 def digits_only(s: str) -> str:
     """Strip non-digit characters."""
-    return re.sub(r"\D", "", s)
+    return _NON_DIGIT_RE.sub("", s)
+
+
+def build_phone_index(contacts: list[dict]) -> dict[str, list[int]]:
+    """Map the last PHONE_SUFFIX_LENGTHS digits of every phone to contact indices."""
+    index = {}
+    for idx, contact in enumerate(contacts):
+        for digits in contact["_phone_digits"]:
+            for k in PHONE_SUFFIX_LENGTHS:
+                if len(digits) >= k:
+                    index.setdefault(digits[-k:], []).append(idx)
+    return index
+
+
+def phone_suffix_matches(phone_index: dict[str, list[int]], query_digits: str) -> set[int]:
+    """Indices of contacts with a phone ending in the query's last digits."""
+    k = next(k for k in PHONE_SUFFIX_LENGTHS if len(query_digits) >= k)
+    return set(phone_index.get(query_digits[-k:], ()))
 
 
 def fuzzy_score(query: str, contact: dict) -> int:
@@ -55,33 +141,25 @@ def fuzzy_score(query: str, contact: dict) -> int:
     best = 0
 
     # Check against name parts
-    for field in [contact["display_name"], contact["given_name"], contact["family_name"]]:
-        val = field.lower()
-        if not val:
-            continue
+    for val in contact["_names_lc"]:
         # Exact substring match
         if query_lower in val or val in query_lower:
             best = max(best, 90)
         else:
-            ratio = SequenceMatcher(None, query_lower, val).ratio()
-            best = max(best, int(ratio * 100))
+            best = max(best, int(similarity(query_lower, val)))
 
     # Check emails
-    for email in contact["emails"]:
-        email_lower = email.lower()
+    for email_lower, local in zip(contact["_emails_lc"], contact["_email_locals_lc"]):
         if query_lower in email_lower:
             best = max(best, 90)
         else:
             # Match against local part
-            local = email_lower.split("@")[0]
-            ratio = SequenceMatcher(None, query_lower, local).ratio()
-            best = max(best, int(ratio * 100))
+            best = max(best, int(similarity(query_lower, local)))
 
     # Check phone numbers (digit matching)
     query_digits = digits_only(query_lower)
     if len(query_digits) >= 4:
-        for phone in contact["phones"]:
-            phone_digits = digits_only(phone)
+        for phone_digits in contact["_phone_digits"]:
             if query_digits in phone_digits or phone_digits in query_digits:
                 best = max(best, 92)
             elif len(phone_digits) >= 4:
@@ -91,13 +169,12 @@ def fuzzy_score(query: str, contact: dict) -> int:
                     best = max(best, 88)
 
     # Check organization
-    if contact["organization"]:
-        org_lower = contact["organization"].lower()
+    org_lower = contact["_org_lc"]
+    if org_lower:
         if query_lower in org_lower:
             best = max(best, 85)
         else:
-            ratio = SequenceMatcher(None, query_lower, org_lower).ratio()
-            best = max(best, int(ratio * 100))
+            best = max(best, int(similarity(query_lower, org_lower)))
 
     return best
 
@@ -109,6 +186,7 @@ def search_api(service, query: str, max_results: int) -> list[dict]:
             query=query,
             readMask=PERSON_FIELDS,
             pageSize=min(max_results, 30),
+            fields=f"results/person({PERSON_RESPONSE_FIELDS})",
         ).execute()
     except Exception as e:
         fail(f"searchContacts API error: {e}")
@@ -125,35 +203,190 @@ def search_api(service, query: str, max_results: int) -> list[dict]:
     return contacts[:max_results]
 
 
-def search_list(service, query: str, max_results: int, threshold: int) -> list[dict]:
-    """Fetch all contacts and fuzzy-match locally (for phone/email lookup)."""
-    contacts = []
+def cache_mtime() -> int:
+    """The address book cache's mtime (0 if missing), part of every result
+    cache key so that a refresh invalidates earlier results."""
+    try:
+        return CACHE_PATH.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def load_cache() -> dict:
+    """Load the cached address book, or an empty one if missing/unreadable."""
+    try:
+        with open(CACHE_PATH) as f:
+            cache = json.load(f)
+        return {"sync_token": cache["sync_token"], "contacts": cache["contacts"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {"sync_token": None, "contacts": []}
+
+
+def save_cache(sync_token: str, contacts: list[dict]):
+    """Write the address book cache atomically; failures only warn."""
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump({"sync_token": sync_token, "contacts": contacts}, f)
+        os.replace(tmp, CACHE_PATH)
+    except OSError as e:
+        print(f"Warning: could not write {CACHE_PATH}: {e}", file=sys.stderr)
+
+
+def is_expired_sync_token(error) -> bool:
+    """True if connections.list rejected the sync token as too old."""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return status == 410 or b"EXPIRED_SYNC_TOKEN" in (getattr(error, "content", None) or b"")
+
+
+def list_connections(service, sync_token: str | None) -> tuple[list[dict], str | None]:
+    """Page through connections.list; return (people, next sync token).
+
+    With a sync token only people changed since it was issued come back,
+    deleted ones flagged with metadata.deleted.
+    """
+    people = []
     page_token = None
 
     while True:
+        result = service.people().connections().list(
+            resourceName="people/me",
+            personFields=PERSON_FIELDS,
+            pageSize=LIST_PAGE_SIZE,
+            pageToken=page_token,
+            syncToken=sync_token,
+            requestSyncToken=True,
+            fields=f"connections({PERSON_RESPONSE_FIELDS},metadata/deleted),nextPageToken,nextSyncToken",
+        ).execute()
+        people.extend(result.get("connections", []))
+
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return people, result.get("nextSyncToken")
+
+
+def load_contacts(service) -> tuple[list[dict], dict, dict]:
+    """Return (every contact, their prefix trie, their phone suffix index),
+    refreshing the disk cache with the changes since last run."""
+    cache = load_cache()
+    sync_token = cache["sync_token"]
+    contacts = {c["resource_name"]: c for c in cache["contacts"]}
+
+    try:
         try:
-            result = service.people().connections().list(
-                resourceName="people/me",
-                personFields=PERSON_FIELDS,
-                pageSize=200,
-                pageToken=page_token,
-            ).execute()
+            people, next_token = list_connections(service, sync_token)
         except Exception as e:
-            fail(f"connections.list API error: {e}")
+            if not (sync_token and is_expired_sync_token(e)):
+                raise
+            # Sync tokens expire after a few days: resync from scratch
+            contacts = {}
+            people, next_token = list_connections(service, None)
+    except Exception as e:
+        fail(f"connections.list API error: {e}")
+
+    for person in people:
+        resource_name = person.get("resourceName", "")
+        if person.get("metadata", {}).get("deleted"):
+            contacts.pop(resource_name, None)
+        else:
+            contacts[resource_name] = extract_contact(person)
 
-        for person in result.get("connections", []):
-            contact = extract_contact(person)
-            score = fuzzy_score(query, contact)
-            if score >= threshold:
-                contact["score"] = score
-                contacts.append(contact)
+    contacts = list(contacts.values())
+    changed = bool(people) or next_token != sync_token
+    if changed:
+        save_cache(next_token, contacts)
 
-        page_token = result.get("nextPageToken")
-        if not page_token:
-            break
+    indexes = None if changed else load_indexes(INDEX_PATH, next_token)
+    if indexes is None:
+        indexes = build_trie(contacts), build_phone_index(contacts)
+        save_indexes(INDEX_PATH, next_token, indexes)
+    trie, phone_index = indexes
+    return contacts, trie, phone_index
+
+
+def word_matches(contacts: list[dict], words: list[str]) -> list[int]:
+    """Indices of contacts whose names, emails or organization contain any of words."""
+    haystacks = (
+        "\t".join([*c["_names_lc"], *c["_emails_lc"], c["_org_lc"]]) for c in contacts
+    )
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for word in words:
+            automaton.add_word(word, word)
+        automaton.make_automaton()
+        return [i for i, hay in enumerate(haystacks) if next(automaton.iter(hay), None) is not None]
+    return [i for i, hay in enumerate(haystacks) if any(word in hay for word in words)]
+
+
+def close_spelling_matches(contacts: list[dict], query: str) -> set[int]:
+    """Indices of contacts with a name, email local part or organization at
+    least UNSHORTLISTED_MAX_SCORE similar to the query (e.g. "johnathan"
+    for "jonathan"), which fuzzy_score may rank above any substring match."""
+    owners = {}
+    for idx, contact in enumerate(contacts):
+        for value in (*contact["_names_lc"], *contact["_email_locals_lc"], contact["_org_lc"]):
+            if value:
+                owners.setdefault(value, []).append(idx)
+    return {
+        idx
+        for value in close_matches(query.lower().strip(), list(owners), UNSHORTLISTED_MAX_SCORE)
+        for idx in owners[value]
+    }
+
+
+def score_contacts(query: str, contacts: list[dict], threshold: int) -> list[dict]:
+    """Score contacts against the query; those reaching threshold, best first."""
+    scored = []
+    for contact in contacts:
+        score = fuzzy_score(query, contact)
+        if score >= threshold:
+            scored.append({**contact, "score": score})
+
+    scored.sort(key=lambda c: c["score"], reverse=True)
+    return scored
+
+
+def fills_results(scored: list[dict], max_results: int, ceiling: int) -> bool:
+    """True if a scored shortlist's top max_results all reach ceiling, the best
+    score of a contact outside it, so none of those can outrank them."""
+    return len(scored) >= max_results and scored[max_results - 1]["score"] >= ceiling
 
-    contacts.sort(key=lambda c: c["score"], reverse=True)
-    return contacts[:max_results]
+
+def search_list(service, query: str, max_results: int, threshold: int) -> list[dict]:
+    """Fuzzy-match the whole (cached) address book locally (for phone/email lookup)."""
+    all_contacts, trie, phone_index = load_contacts(service)
+
+    # Only the contacts on a shortlist (plus close spellings of the query)
+    # are scored if enough of them score as high as anyone left off it could
+    shortlists = []
+    query_digits = digits_only(query)
+    if len(query_digits) >= 4:
+        # Phone lookup: contacts whose number ends the same way
+        shortlists.append(lambda: phone_suffix_matches(phone_index, query_digits))
+        ceiling = UNSHORTLISTED_PHONE_MAX_SCORE
+    elif not query_digits:
+        # Contacts with a name, email local part or organization starting
+        # with the query, or for multi-word queries ("john smith")
+        # containing one of its words
+        words = [w for w in query.lower().split() if len(w) >= MIN_QUERY_WORD]
+        shortlists.append(lambda: prefix_matches(trie, query.lower().strip()))
+        if len(words) > 1:
+            shortlists.append(lambda: word_matches(all_contacts, words))
+        ceiling = UNSHORTLISTED_MAX_SCORE
+
+    close_spellings = None
+    for shortlist in shortlists:
+        indices = shortlist()
+        if len(indices) >= max_results:
+            if close_spellings is None:
+                close_spellings = close_spelling_matches(all_contacts, query)
+            indices = sorted(close_spellings.union(indices))
+            scored = score_contacts(query, [all_contacts[i] for i in indices], threshold)
+            if fills_results(scored, max_results, ceiling):
+                return scored[:max_results]
+
+    return score_contacts(query, all_contacts, threshold)[:max_results]
 
 
 if __name__ == "__main__":
@@ -166,16 +399,27 @@ if __name__ == "__main__":
                         help="Min fuzzy score 0-100 for list method (default: 40)")
     args = parser.parse_args()
 
-    service = build_people_service()
+    # Repeats of a recent search are answered from the result cache
+    query_key = (args.method, args.query.strip().lower(), args.max, args.threshold)
+    results = get_cached(cache_key(*query_key, cache_mtime()))
 
-    if args.method == "search":
-        results = search_api(service, args.query, args.max)
-    else:
-        results = search_list(service, args.query, args.max, args.threshold)
+    if results is None:
+        service = build_people_service()
+
+        if args.method == "search":
+            results = search_api(service, args.query, args.max)
+        else:
+            results = search_list(service, args.query, args.max, args.threshold)
+        # A follow-up contacts_update of one of these can skip its get()
+        remember_etags({c["resource_name"]: c.get("_etag") for c in results})
+        results = [public(c) for c in results]
+        # Keyed by the mtime after the search: --method list may have just
+        # rewritten the address book cache with a new sync token
+        put_cached(cache_key(*query_key, cache_mtime()), results)
 
-    print(json.dumps({
+    print(dumps({
         "query": args.query,
         "method": args.method,
         "count": len(results),
         "contacts": results,
-    }, indent=2))
+    }, pretty=True))
@@ -0,0 +1,81 @@
+"""Prefix trie over contact name, email and organization tokens.
+
+The trie is a dict of dicts keyed by character; the END key of a node
+lists the indices (into the contact list it was built from) of contacts
+having a token that ends there.
+"""
+import os
+import pickle
+import re
+import sys
+from pathlib import Path
+
+END = ""  # never a character key, unlike "$"
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def contact_tokens(contact: dict) -> set[str]:
+    """Lowercased whole names/email local parts/organization and the words in them."""
+    values = [*contact["_names_lc"], *contact["_email_locals_lc"]]
+    if contact["_org_lc"]:
+        values.append(contact["_org_lc"])
+    tokens = set(values)
+    for value in values:
+        tokens.update(_WORD_RE.findall(value))
+    return tokens
+
+
+def build_trie(contacts: list[dict]) -> dict:
+    """Build a prefix trie mapping each contact's tokens to its list index."""
+    trie = {}
+    for idx, contact in enumerate(contacts):
+        for token in contact_tokens(contact):
+            node = trie
+            for ch in token:
+                node = node.setdefault(ch, {})
+            node.setdefault(END, []).append(idx)
+    return trie
+
+
+def prefix_matches(trie: dict, prefix: str) -> set[int]:
+    """Indices of contacts with a token starting with prefix."""
+    node = trie
+    for ch in prefix:
+        node = node.get(ch)
+        if node is None:
+            return set()
+
+    matches = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        for key, child in node.items():
+            if key == END:
+                matches.update(child)
+            else:
+                stack.append(child)
+    return matches
+
+
+def load_indexes(path: Path, sync_token: str | None):
+    """Load pickled search indexes, or None if missing or built for another sync token."""
+    try:
+        with open(path, "rb") as f:
+            saved_token, indexes = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        return None
+    return indexes if saved_token == sync_token else None
+
+
+def save_indexes(path: Path, sync_token: str | None, indexes):
+    """Pickle search indexes (e.g. the trie) atomically next to the contacts
+    cache; failures only warn."""
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            pickle.dump((sync_token, indexes), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not write {path}: {e}", file=sys.stderr)
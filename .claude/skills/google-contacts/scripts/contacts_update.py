@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Update an existing Google Contact."""
 import sys
-import json
 import argparse
 from pathlib import Path
 
@@ -10,7 +9,35 @@ if PACKAGES_PATH not in sys.path:
     sys.path.insert(0, PACKAGES_PATH)
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _common import build_people_service, fail, PERSON_FIELDS
+from _common import build_people_service, dumps, fail, load_etags, remember_etags, PERSON_FIELDS
+from _search_cache import clear_cached
+
+
+def fetch_contact(service, resource_name: str) -> dict:
+    """Get the contact's current state (and etag)."""
+    try:
+        return service.people().get(
+            resourceName=resource_name,
+            personFields=PERSON_FIELDS,
+        ).execute()
+    except Exception as e:
+        fail(f"Failed to fetch contact: {e}")
+
+
+def is_stale_etag(error) -> bool:
+    """True if updateContact rejected the request's etag as out of date."""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return status == 400 and b"FAILED_PRECONDITION" in (getattr(error, "content", None) or b"")
+
+
+def update_contact(service, resource_name: str, body: dict, update_fields: list[str]) -> dict:
+    """Send updateContact for update_fields; return the updated person."""
+    return service.people().updateContact(
+        resourceName=resource_name,
+        body=body,
+        updatePersonFields=",".join(update_fields),
+        personFields=PERSON_FIELDS,
+    ).execute()
 
 
 if __name__ == "__main__":
@@ -28,16 +55,16 @@ if __name__ == "__main__":
 
     service = build_people_service()
 
-    # Fetch current contact for etag
-    try:
-        current = service.people().get(
-            resourceName=args.resource_name,
-            personFields=PERSON_FIELDS,
-        ).execute()
-    except Exception as e:
-        fail(f"Failed to fetch contact: {e}")
-
-    etag = current.get("etag", "")
+    # Names and organizations are merged with their current values, so need
+    # the contact itself; other fields are replaced outright, so the etag
+    # from a recent search is enough.
+    merges = any(v is not None for v in (args.given_name, args.family_name, args.organization, args.job_title))
+    etag = None if merges else load_etags().get(args.resource_name)
+    used_cached_etag = etag is not None
+    current = {}
+    if not used_cached_etag:
+        current = fetch_contact(service, args.resource_name)
+        etag = current.get("etag", "")
     update_fields = []
 
     # Build update body — only modify specified fields
@@ -79,20 +106,25 @@ if __name__ == "__main__":
         fail("No fields specified to update. Use --given-name, --email, --phone, etc.")
 
     try:
-        result = service.people().updateContact(
-            resourceName=args.resource_name,
-            body=body,
-            updatePersonFields=",".join(update_fields),
-            personFields=PERSON_FIELDS,
-        ).execute()
+        try:
+            result = update_contact(service, args.resource_name, body, update_fields)
+        except Exception as e:
+            if not (used_cached_etag and is_stale_etag(e)):
+                raise
+            # The contact changed since it was last seen: retry with its current etag
+            body["etag"] = fetch_contact(service, args.resource_name).get("etag", "")
+            result = update_contact(service, args.resource_name, body, update_fields)
     except Exception as e:
         fail(f"updateContact API error: {e}")
+    remember_etags({args.resource_name: result.get("etag")})
+
+    clear_cached()  # cached search results may now be stale
 
     names = result.get("names", [{}])
     name = names[0] if names else {}
-    print(json.dumps({
+    print(dumps({
         "ok": True,
         "resource_name": result.get("resourceName", ""),
         "display_name": name.get("displayName", ""),
         "message": f"Contact '{name.get('displayName', '')}' updated. Fields: {', '.join(update_fields)}",
-    }, indent=2))
+    }, pretty=True))
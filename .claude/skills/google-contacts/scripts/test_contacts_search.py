@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for contacts_search's local (--method list) search.
+
+Run with: python3 -m unittest discover -s .claude/skills/google-contacts/scripts
+"""
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+import contacts_search
+
+
+def person(i: int, name: str, phone: str = "", org: str = "") -> dict:
+    given, _, family = name.partition(" ")
+    p = {
+        "resourceName": f"people/c{i}",
+        "names": [{"displayName": name, "givenName": given, "familyName": family}],
+    }
+    if phone:
+        p["phoneNumbers"] = [{"value": phone}]
+    if org:
+        p["organizations"] = [{"name": org}]
+    return p
+
+
+class SearchListTest(unittest.TestCase):
+    def search(self, people: list[dict], query: str, max_results: int = 10) -> list[dict]:
+        """search_list() over people, checked against scoring every contact."""
+        contacts = [contacts_search.extract_contact(p) for p in people]
+        indexes = contacts_search.build_trie(contacts), contacts_search.build_phone_index(contacts)
+        with mock.patch.object(contacts_search, "load_contacts", return_value=(contacts, *indexes)):
+            results = contacts_search.search_list(None, query, max_results, 40)
+        full_scan = contacts_search.score_contacts(query, contacts, 40)[:max_results]
+        self.assertEqual([c["score"] for c in results], [c["score"] for c in full_scan])
+        return results
+
+    def test_phone_contained_but_not_a_suffix(self):
+        results = self.search([
+            person(1, "Alice Adams", "0412 555 111"),
+            person(2, "Bob Brown", "0412 555 222"),
+            person(3, "Carl Clark", "+61 3 9999 0412"),
+        ], "0412")
+        self.assertEqual(sorted(c["display_name"] for c in results), ["Alice Adams", "Bob Brown", "Carl Clark"])
+        self.assertTrue(all(c["score"] == 92 for c in results))
+
+    def test_close_spelling_outranks_prefix_shortlist(self):
+        people = [person(i, f"Jonathan Lee{i}") for i in range(10)]
+        people.append(person(10, "Johnathan Smith"))
+        results = self.search(people, "jonathan")
+        self.assertEqual(results[0]["display_name"], "Johnathan Smith")
+        self.assertGreater(results[0]["score"], 90)
+
+
+if __name__ == "__main__":
+    unittest.main()
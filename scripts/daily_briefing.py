@@ -1,20 +1,18 @@
 #!/usr/bin/env python3
 """Generate a daily calendar briefing."""
 import sys
-import json
-import subprocess
 from datetime import datetime
-from zoneinfo import ZoneInfo
 
-tz = ZoneInfo("Australia/Melbourne")
-now = datetime.now(tz=tz)
+# Called in-process rather than as a subprocess: no second interpreter
+# start-up or JSON round trip
+sys.path.insert(0, "/home/ubuntu/agent/.claude/skills/google-calendar/scripts")
+from _common import get_tz
+from ical_fetch import ICAL_URL, fetch_and_parse
 
-result = subprocess.run(
-    ["python3", "/home/ubuntu/agent/.claude/skills/google-calendar/scripts/ical_fetch.py", "--days", "1"],
-    capture_output=True, text=True
-)
+tz = get_tz()
+now = datetime.now(tz=tz)
 
-data = json.loads(result.stdout)
+data = fetch_and_parse(ICAL_URL, days=1)
 events = data.get("events", [])
 
 today_str = now.strftime("%A, %d %B %Y")